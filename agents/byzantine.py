@@ -1,18 +1,24 @@
-import random
-
 from agents.validator import Validator
 
 class Byzantine (Validator):
-    def __init__(self, id , stake, apr_window, victims, vote_omission_attack_on, vote_delay_attack_on, prob_to_control_aggregator):
-        super().__init__(id , stake, apr_window=apr_window)
+    _STATE = Validator._STATE + ("victims", "vote_omission_attack_on", "vote_delay_attack_on", "prob_to_control_aggregator",
+                                 "leader_count", "attack_count")
+
+    def __init__(self, id , stake, apr_window, victims, vote_omission_attack_on, vote_delay_attack_on, prob_to_control_aggregator, rng=None):
+        super().__init__(id , stake, apr_window=apr_window, rng=rng)
         self.victims = victims
         self.vote_omission_attack_on = vote_omission_attack_on
         self.vote_delay_attack_on = vote_delay_attack_on
         self.prob_to_control_aggregator = prob_to_control_aggregator
-        pass
+        self.leader_count = 0 # rounds in which the attacker proposed
+        self.attack_count = 0 # rounds in which an attack was carried out (omission or delay)
+
+    def propose(self, committee):
+        self.leader_count += 1
+        return super().propose(committee)
 
     def select_voters(self, votes):
-        r = random.random()
+        r = self.rng.random()
         if not self.vote_omission_attack_on:
             return super().select_voters(votes)
 
@@ -20,6 +26,7 @@ class Byzantine (Validator):
         if r > self.prob_to_control_aggregator:
             return super().select_voters(votes)
 
+        self.attack_count += 1
         voters = []
         for voter in votes:
             if voter not in self.victims:
@@ -27,8 +34,23 @@ class Byzantine (Validator):
                     voters.append(voter)
         return voters
 
+    def select_voter_mask(self, committee, mask):
+        r = self.rng.random()
+        if not self.vote_omission_attack_on or r > self.prob_to_control_aggregator:
+            return super().select_voter_mask(committee, mask)
+
+        self.attack_count += 1
+        for victim in self.victims:
+            i = committee.position(victim)
+            if i is not None:
+                mask[i] = False
+        return mask
+
     def vote_for_leader(self, leader):
         if not self.vote_delay_attack_on:
             return super().vote_for_leader(leader)
 
-        return leader not in self.victims
\ No newline at end of file
+        if leader in self.victims:
+            self.attack_count += 1
+            return False
+        return True
\ No newline at end of file
@@ -1,13 +1,22 @@
 import random
 import math
+from agents.state import AttributeState
+
+class Delegator(AttributeState):
+    rng = random # random source, overridden per instance by initialize_world(rng=...)
+    choice_rng = None # optional separate source for pool selection (defaults to rng)
+    # instance attributes copied by Protocol.fork() and checkpoints (see AttributeState)
+    _STATE = ("id", "rng", "choice_rng", "stake", "bounded_validator", "_settled_reward", "aggressiveness", "loyalty",
+              "apr_gap_threshold", "streak_required", "dissatisfied_streak", "pull_prob", "star_gap_multiplier")
 
-class Delegator:
     def __init__ (self , id , stake, aggressiveness = 1, loyalty = 0, apr_gap_threshold = 0.0035, streak_required = 1500,
-                 pull_prob = 0.0, star_gap_multiplier = 3.0):
+                 pull_prob = 0.0, star_gap_multiplier = 3.0, rng=None):
         self.id = id
+        if rng is not None:
+            self.rng = rng
         self.stake = stake
         self.bounded_validator = None
-        self.total_reward = 0
+        self._settled_reward = 0 # rewards already credited; see total_reward
         self.aggressiveness = aggressiveness #Describes how aggressive delegators are in terms of selecting the best validator.
         self.loyalty = loyalty #Describes delegators loyalty. Should be between 0 and 1. Bigger loyalty indicates that the delegator changes the validator less often.
         self.apr_gap_threshold = apr_gap_threshold
@@ -25,8 +34,16 @@ class Delegator:
         delegator_share = (self.stake / self.bounded_validator.voting_power) * validator_share
         return delegator_share
 
+    @property
+    def total_reward(self):
+        """Settled rewards plus the rewards accrued in the current pool since the last settlement."""
+        pool = self.bounded_validator
+        if pool is not None and self in pool.delegators:
+            return self._settled_reward + pool.unsettled_reward(self)
+        return self._settled_reward
+
     def update_reward(self, reward):
-        self.total_reward += reward
+        self._settled_reward += reward
 
     def choose_validator_by_apr(self, pool):
         """
@@ -48,7 +65,7 @@ class Delegator:
           PATH 1 — PULL (fast): fires probabilistically when APR gap > star_threshold.
           PATH 2 — PUSH (slow): streak-based flee from underperformer.
         """
-        r = random.random()
+        r = self.rng.random()
         if self.bounded_validator is None:
             return self._pick_logit(pool, current=None)
 
@@ -109,11 +126,12 @@ class Delegator:
         m = max(utilities) if utilities else 0.0
         weights = [math.exp(beta * (u - m)) + eps for u in utilities]
 
-        chosen = random.choices(pool, weights=weights, k=1)[0]
+        rng = self.choice_rng if self.choice_rng is not None else self.rng
+        chosen = rng.choices(pool, weights=weights, k=1)[0]
         return chosen
 
     def _pick_weighted_by_apr(self, pool):
         # Ensure positive weights even if APR is 0
         eps = 1e-12
         weights = [(max(v.apr, 0.0) + eps) ** self.aggressiveness for v in pool]
-        return random.choices(pool, weights=weights, k=1)[0]
\ No newline at end of file
+        return self.rng.choices(pool, weights=weights, k=1)[0]
\ No newline at end of file
@@ -0,0 +1,28 @@
+_NO_DEFAULT = object()
+
+
+class AttributeState:
+    """
+    Pickle / deepcopy support for the agents that never touches the instance __dict__.
+
+    The default state is the __dict__ itself. On CPython 3.11 reading it turns an object's
+    inline attribute storage into a real dict, and every later attribute access on that agent
+    gets slower: a checkpointed or forked run would lose a third of its speed. Subclasses
+    list their instance attributes in _STATE instead, and the state is read and written one
+    attribute at a time. Attributes still equal to their class-level default (e.g. rng) are
+    left out and fall back to that default after loading.
+    """
+    _STATE = ()
+
+    def __getstate__(self):
+        cls = type(self)
+        state = {}
+        for name in self._STATE:
+            value = getattr(self, name)
+            if value is not getattr(cls, name, _NO_DEFAULT):
+                state[name] = value
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
@@ -1,21 +1,33 @@
 import random
-from model.block import Block
+from agents.state import AttributeState
 # from collections import deque
 
-class Validator:
-    def __init__ (self , id , stake, apr_window, is_pool=False, commission_rate=0.0):
+class Validator(AttributeState):
+    rng = random # random source, overridden per instance by initialize_world(rng=...)
+    sampler = None # WeightedSampler over voting power (World.voting_power_sampler), updated on every change
+    # instance attributes copied by Protocol.fork() and checkpoints (see AttributeState)
+    _STATE = ("id", "stake", "is_pool", "commission_rate", "rng", "proposed_blocks", "delegators", "voting_power",
+              "count", "dcount", "overall_rewards", "total_reward", "_reward_per_stake", "_apr_window", "_alpha_ema",
+              "_last_overall_rewards", "apr", "delegator_apr", "_ema_return", "score", "_ema_uptime", "sampler")
+
+    def __init__ (self , id , stake, apr_window, is_pool=False, commission_rate=0.0, rng=None):
         self.id = id
         self.stake = stake
         self.is_pool = is_pool
         self.commission_rate = commission_rate # for pools functionality
+        if rng is not None:
+            self.rng = rng
         self.proposed_blocks = []
-        self.delegators = {}
+        self.delegators = {} # delegator -> reward index (_reward_per_stake) at which it was last settled
         self.voting_power = self.stake
         self.count = 0 # Number of times the validator was in the committee
         self.dcount = 0 # total number of delegators
         # rewards
         self.overall_rewards = 0 # reward for all voting power
         self.total_reward = 0
+        # F1-style cumulative delegator reward per unit of delegated stake.
+        # Delegators are paid lazily: stake * (index now - index when last settled).
+        self._reward_per_stake = 0.0
         self._apr_window = apr_window
         self._alpha_ema = 2.0 / (apr_window + 1.0)   # precomputed once; shared by APR and uptime EMA
         self._last_overall_rewards = 0.0
@@ -30,8 +42,7 @@ class Validator:
         self._ema_uptime = 1.0
 
     def propose(self, committee):
-        r = random.randint(0, 100)
-        b = Block(r, self, committee)
+        b = committee.new_block(self)
         self.proposed_blocks.append(b)
         return b
 
@@ -47,18 +58,41 @@ class Validator:
                 voters.append(voter)
         return voters
 
-    def remove_delegator(self, delegator):
-        self.delegators[delegator] = 0
+    def select_voter_mask(self, committee, mask):
+        """Vector form of select_voters: `mask` marks the YES voters among committee.validators."""
+        return mask
+
+    def remove_delegator(self, delegator, sync=True):
+        self.settle_delegator(delegator)
+        del self.delegators[delegator]
         self.voting_power -= delegator.stake
         self.dcount -= 1
+        if sync:
+            self.sync_voting_power()
 
-    def add_delegator(self, delegator):
+    def add_delegator(self, delegator, sync=True):
         if not self.is_pool:
             raise ValueError(f"Validator {self.id} is not a pool and cannot accept delegations.")
 
-        self.delegators[delegator] = delegator.stake
+        self.delegators[delegator] = self._reward_per_stake
         self.voting_power += delegator.stake
         self.dcount += 1
+        if sync:
+            self.sync_voting_power()
+
+    def sync_voting_power(self):
+        """Pass voting_power on to the sampler (sync=False above leaves that to the caller, once per batch)."""
+        if self.sampler is not None:
+            self.sampler.update(self, self.voting_power)
+
+    def unsettled_reward(self, delegator):
+        """Rewards earned by `delegator` in this pool since it was last settled."""
+        return delegator.stake * (self._reward_per_stake - self.delegators[delegator])
+
+    def settle_delegator(self, delegator):
+        """Credit the delegator's unsettled rewards and move its entry to the current index."""
+        delegator.update_reward(self.unsettled_reward(delegator))
+        self.delegators[delegator] = self._reward_per_stake
 
     def update_reward(self, reward):
         self.overall_rewards += reward
@@ -74,10 +108,9 @@ class Validator:
         operator_staker_share = distributable * (self.stake / self.voting_power)
         self.total_reward += operator_staker_share
 
-        for delegator in self.delegators:
-            if self.delegators[delegator] > 0:
-                share = (delegator.stake / self.voting_power) * distributable
-                delegator.update_reward(share)
+        # O(1): each delegator's share (delegator.stake / voting_power) * distributable
+        # is settled lazily from the index (see settle_delegator / Delegator.total_reward)
+        self._reward_per_stake += distributable / self.voting_power
 
     def update_apr(self, rounds_per_year):
         """
@@ -0,0 +1,51 @@
+"""
+Checkpoint overhead benchmark: time spent saving checkpoints as a share of the run time.
+
+Runs the main.py Cosmos configuration (100 validators, 1,000 delegators, migrations on) with a
+time-based Checkpointer whose every_seconds is far below what max_overhead allows, so the
+overhead budget decides when to save. Save time is summed by the checkpointer itself
+(total_save_seconds), which is steadier than comparing two wall-clock runs.
+Reported per chain retention policy: saves, total / mean save time, overhead, checkpoint size.
+Run from the repository root:
+    python -m benchmarks.checkpoint_overhead
+"""
+import os
+import random
+import tempfile
+import time
+
+from engine.chain import CountRetention
+from engine.checkpoint import Checkpointer
+from engine.simulation import build_protocol
+from main import get_cosmos_setup_with_proposer_bonus
+
+
+def run(rounds, chain_retention, every_seconds, max_overhead, path, seed=42):
+    checkpointer = Checkpointer(path, every_seconds=every_seconds, max_overhead=max_overhead)
+    protocol = build_protocol(100, rounds, 4.26e-7, 1, 82125, True, False, 50,
+                              get_cosmos_setup_with_proposer_bonus(), victim_stake=0.005, attacker_stake=0.3,
+                              pool_weights=[0.005] * 4, loyalty=0.8, pool_selection_weighted=True,
+                              validators_stake_dirichlet_distributed=True,
+                              delegators_stake_lognormal_distributed=True, aggregators_number=0, pull_prob=0.03,
+                              star_gap_multiplier=2, rng=random.Random(seed), checkpointer=checkpointer,
+                              chain_retention=chain_retention)
+    start = time.monotonic()
+    protocol.run()
+    elapsed = time.monotonic() - start
+    return checkpointer, elapsed, os.path.getsize(path)
+
+
+def main(rounds=30_000, every_seconds=0.2, max_overhead=0.02):
+    print(f"{rounds} rounds, every_seconds={every_seconds}, max_overhead={max_overhead:.0%}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, retention in (("full chain", None), ("CountRetention", CountRetention())):
+            checkpointer, elapsed, size = run(rounds, retention, every_seconds, max_overhead,
+                                              os.path.join(directory, "run.ckpt"))
+            mean = checkpointer.total_save_seconds / max(checkpointer.saves, 1)
+            print(f"  {name:>14}: run {elapsed:6.2f} s   {checkpointer.saves:3d} saves   "
+                  f"save total {checkpointer.total_save_seconds:6.3f} s (mean {mean * 1e3:6.1f} ms)   "
+                  f"overhead {checkpointer.total_save_seconds / elapsed:6.2%}   last checkpoint {size / 2 ** 20:6.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Committee sampling benchmark: a 1,000-member committee from 10,000 validators.
+
+Compares WeightedRandomCommitteeSelector (Efraimidis-Spirakis keys) with the previous
+implementation, which redrew random.choices until enough distinct validators came up.
+Run from the repository root:
+    python -m benchmarks.committee_sampling
+"""
+import random
+import time
+
+from agents.validator import Validator
+from setups.committee_selector import WeightedRandomCommitteeSelector
+
+
+def rejection_select(rng, validators, size):
+    """the previous WeightedRandomCommitteeSelector.select"""
+    size = min(size, len(validators))
+    chosen = set()
+    weights = [v.voting_power for v in validators]
+    while len(chosen) < size:
+        chosen.add(rng.choices(validators, weights=weights, k=1)[0])
+    return list(chosen)
+
+
+def make_validators(n, sigma, rng):
+    """n validators with lognormal stakes; larger sigma = more concentrated stake"""
+    return [Validator(i, rng.lognormvariate(0.0, sigma), apr_window=20) for i in range(n)]
+
+
+def best_time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(num_validators=10_000, committee_size=1_000, repeat=5, seed=1):
+    rng = random.Random(seed)
+    selector = WeightedRandomCommitteeSelector()
+    selector.rng = random.Random(seed)
+    print(f"committee of {committee_size} from {num_validators} validators (best of {repeat})")
+    for sigma in (0.5, 1.0, 2.0):
+        validators = make_validators(num_validators, sigma, rng)
+        old = best_time(lambda: rejection_select(rng, validators, committee_size), repeat)
+        new = best_time(lambda: selector.select(validators, committee_size), repeat)
+        print(f"  stake sigma {sigma}: rejection {old * 1e3:8.2f} ms   "
+              f"efraimidis-spirakis {new * 1e3:6.2f} ms   speedup {old / new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
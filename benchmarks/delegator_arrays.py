@@ -0,0 +1,76 @@
+"""
+Equivalence check and benchmark of DelegatorArrays against the per-delegator loop.
+
+DelegatorArrays reads the delegators' random numbers ahead from a copy of the generator
+(getrandbits words turned back into random() values), so its decisions must match
+Delegator.choose_validator_by_apr exactly. For the Cosmos and Lido configurations of main.py,
+with one shared rng and with RandomStreams (paired runs), this steps two protocols built from
+the same seed, one with delegator_arrays set to None, and compares the histories, every
+delegator's pool and dissatisfied_streak, and the generators' final states.
+Exits with status 1 on any difference. Run from the repository root:
+    python -m benchmarks.delegator_arrays
+"""
+import random
+import sys
+import time
+
+from engine.rng import RandomStreams
+from engine.simulation import build_protocol
+from main import get_cosmos_setup_with_proposer_bonus, get_eth_lido_setup
+
+SETUPS = {
+    "cosmos": (get_cosmos_setup_with_proposer_bonus, 50, 0),  # (setup factory, apr_window, aggregators_number)
+    "lido": (get_eth_lido_setup, 300, 8),
+}
+
+
+def build(setup_name, rounds, seed, paired):
+    factory, apr_window, aggregators_number = SETUPS[setup_name]
+    draws = {"streams": RandomStreams(seed)} if paired else {"rng": random.Random(seed)}
+    return build_protocol(100, rounds, 4.26e-7, 1, 82125, True, False, apr_window, factory(),
+                          victim_stake=0.005, attacker_stake=0.3, pool_weights=[0.005] * 4, loyalty=0.8,
+                          pool_selection_weighted=True, validators_stake_dirichlet_distributed=True,
+                          delegators_stake_lognormal_distributed=True, aggregators_number=aggregators_number,
+                          pull_prob=0.03, star_gap_multiplier=2, **draws)
+
+
+def run(protocol):
+    """Step every round as run_paired_simulation does, then write the streaks back; returns seconds."""
+    start = time.perf_counter()
+    for i in range(protocol.rounds):
+        protocol.step(i)
+    protocol.sync()
+    return time.perf_counter() - start
+
+
+def state(protocol):
+    delegators = [(d.bounded_validator.id, d.dissatisfied_streak) for d in protocol.world.delegators]
+    rngs = {id(d.rng): d.rng.getstate() for d in protocol.world.delegators}
+    return protocol.metrics.history, delegators, list(rngs.values())
+
+
+def check(setup_name, rounds, seed, paired):
+    """(matches, loop seconds, arrays seconds) for one configuration."""
+    loop = build(setup_name, rounds, seed, paired)
+    loop.delegator_arrays = None
+    arrays = build(setup_name, rounds, seed, paired)
+    if arrays.delegator_arrays is None:
+        raise RuntimeError(f"{setup_name}: DelegatorArrays.build fell back to the loop")
+    loop_s, arrays_s = run(loop), run(arrays)
+    return state(loop) == state(arrays), loop_s, arrays_s
+
+
+def main(rounds=3000, seed=42):
+    failures = 0
+    for setup_name in SETUPS:
+        for paired in (False, True):
+            matches, loop_s, arrays_s = check(setup_name, rounds, seed, paired)
+            failures += not matches
+            mode = "RandomStreams" if paired else "shared rng"
+            print(f"{setup_name:>7} {mode:>13}: {'identical' if matches else 'DIFFERENT':>9}   "
+                  f"loop {loop_s:6.2f} s   arrays {arrays_s:6.2f} s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
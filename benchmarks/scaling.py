@@ -0,0 +1,230 @@
+"""
+Scaling benchmark of the simulation core.
+
+Scenarios are named <setup>-v<validators>-d<delegators>-<migrations>, e.g. lido-v1k-d100k-mig:
+  setup        cosmos-bonus, cosmos (no proposer bonus), lido, rocketpool (the main.py setups)
+  validators   100, 1k, 10k
+  delegators   1k, 100k, 1M
+  migrations   mig (loyalty 0.8, pull_prob 0.03: delegators move) or static (loyalty 1, pull_prob 0)
+Each scenario runs in a fresh process and reports
+  init_s               initialize_world + Protocol construction
+  rounds_per_s         rounds per second after the delegation warm-up (median of CHUNKS timed chunks)
+  peak_rss_mib         peak resident set size of the scenario's process (None where `resource` is missing)
+  alloc_kib_per_round  memory a round allocates above what was held before it (tracemalloc peak,
+                       measured on separate rounds because tracing slows the run down)
+  blocks_per_round     net growth of allocated Python memory blocks per timed round
+Results are written as JSON; with --baseline every scenario is compared with a stored run and
+the command exits with status 1 if one got slower than --tolerance allows.
+Run from the repository root:
+    python -m benchmarks.scaling --quick --output bench.json
+    python -m benchmarks.scaling --filter "lido-*-mig" --baseline benchmarks/baseline.json
+    python -m benchmarks.scaling --quick --output benchmarks/baseline.json   # store a new baseline
+"""
+import argparse
+import fnmatch
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from engine.initializer import initialize_world
+from engine.protocol import Protocol
+from main import (get_cosmos_setup_with_proposer_bonus, get_cosmos_setup_without_proposer_bonus,
+                  get_eth_lido_setup, get_eth_rocketpool_setup)
+
+SETUPS = {
+    "cosmos-bonus": (get_cosmos_setup_with_proposer_bonus, 0),  # (setup factory, aggregators_number)
+    "cosmos": (get_cosmos_setup_without_proposer_bonus, 0),
+    "lido": (get_eth_lido_setup, 8),
+    "rocketpool": (get_eth_rocketpool_setup, 8),
+}
+VALIDATORS = {"v100": 100, "v1k": 1_000, "v10k": 10_000}
+DELEGATORS = {"d1k": 1_000, "d100k": 100_000, "d1M": 1_000_000}
+MIGRATIONS = {"mig": (0.8, 0.03), "static": (1.0, 0.0)}  # (loyalty, pull_prob)
+QUICK = ("*-v100-d1k-*", "*-v100-d100k-*", "*-v1k-d1k-*", "*-v1k-d100k-*")
+
+POOL_WEIGHTS = [0.005] * 4
+APR_WINDOW = 20  # delegators start deciding after 3 * APR_WINDOW rounds
+CHUNKS = 5  # the timed rounds run in chunks; rounds_per_s is the median chunk's rate
+
+
+def scenarios():
+    """{name: (setup, validators, delegators, migrations)} of the full matrix."""
+    return {f"{s}-{v}-{d}-{m}": (s, v, d, m)
+            for s, v, d, m in itertools.product(SETUPS, VALIDATORS, DELEGATORS, MIGRATIONS)}
+
+
+def build(setup_name, num_validators, num_delegators, migrations, seed, **protocol_options):
+    factory, aggregators_number = SETUPS[setup_name]
+    loyalty, pull_prob = MIGRATIONS[migrations]
+    rng = random.Random(seed)
+    setup = factory().bind_rng(rng)
+    world = initialize_world(
+        num_validators=num_validators - len(POOL_WEIGHTS) - 2,  # pools, victim and attacker come on top
+        pools_voting_powers=POOL_WEIGHTS,
+        num_delegators=num_delegators,
+        setup=setup,
+        reward_per_round=4.26e-7,
+        aggressiveness=0.1,
+        loyalty=loyalty,
+        validators_stake_dirichlet_distributed=False,  # the Dirichlet shares' 0.001 floor allows < 1,000 validators
+        aggregators_number=aggregators_number,
+        apr_window=APR_WINDOW,
+        pool_commission_rate=setup.pool_commission_rate,
+        byzantine_validator_stake=0.3,
+        victim_pool_stake=0.005,
+        vote_omission_attack_on=True,
+        pull_prob=pull_prob,
+        star_gap_multiplier=2,
+        rng=rng,
+    )
+    return Protocol(100, world, rounds=sys.maxsize, migration_delay_rounds=1, rounds_per_year=82125,
+                    update_delegation_warm_up_rounds=3 * APR_WINDOW, verbose=False, **protocol_options)
+
+
+def run_scenario(name, rounds, traced_rounds, seed, protocol_options):
+    """One scenario (called in a fresh process): its measurements as a dict."""
+    setup_name, validators, delegators, migrations = scenarios()[name]
+    start = time.perf_counter()
+    protocol = build(setup_name, VALIDATORS[validators], DELEGATORS[delegators], migrations, seed, **protocol_options)
+    init_s = time.perf_counter() - start
+
+    warm_up = protocol.update_delegation_warm_up_rounds + 1
+    protocol.run_until(warm_up)
+    blocks = sys.getallocatedblocks()
+    rates = []
+    chunk = max(rounds // CHUNKS, 1)
+    while protocol.next_round < warm_up + rounds:
+        end = min(protocol.next_round + chunk, warm_up + rounds)
+        executed = end - protocol.next_round
+        start = time.perf_counter()
+        protocol.run_until(end)
+        rates.append(executed / (time.perf_counter() - start))
+    blocks_per_round = (sys.getallocatedblocks() - blocks) / rounds
+
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(traced_rounds):
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        protocol.run_until(protocol.next_round + 1)
+        allocated += tracemalloc.get_traced_memory()[1] - held
+    tracemalloc.stop()
+
+    peak_rss_mib = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_rss_mib = peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10  # bytes on macOS, KiB elsewhere
+    return {
+        "init_s": init_s,
+        "rounds_per_s": statistics.median(rates),
+        "peak_rss_mib": peak_rss_mib,
+        "alloc_kib_per_round": allocated / traced_rounds / 1024 if traced_rounds else None,
+        "blocks_per_round": blocks_per_round,
+    }
+
+
+def run(names, rounds, traced_rounds=3, seed=1, protocol_options=None):
+    """Run the named scenarios one after the other, each in its own process; returns the results document."""
+    results = {}
+    context = multiprocessing.get_context("spawn")  # a fresh process, so peak RSS is the scenario's own
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[name] = executor.submit(run_scenario, name, rounds, traced_rounds, seed,
+                                            protocol_options or {}).result()
+        print(format_row(name, results[name]), flush=True)
+    return {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "rounds": rounds,
+        "protocol_options": protocol_options or {},
+        "scenarios": results,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Lines comparing every scenario of `results` with the baseline; returns (lines, regressions), where
+    a regression is a scenario whose rounds/s dropped or whose init time grew by more than `tolerance`
+    (init times also need to grow by 10 ms, so millisecond-scale inits do not trip on noise).
+    Scenarios the baseline lacks get a "no baseline" line (benchmarks/baseline.json has the --quick set).
+    """
+    lines = [f"{'scenario':>30} | {'rounds/s':>10} | {'baseline':>10} | {'ratio':>6} | {'init s':>8} | {'baseline':>8}"]
+    regressions = []
+    for name, new in results["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            lines.append(f"{name:>30} | {new['rounds_per_s']:>10.1f} | {'n/a':>10} | {'n/a':>6} | "
+                         f"{new['init_s']:>8.3f} | {'n/a':>8}   NO BASELINE")
+            continue
+        speed = new["rounds_per_s"] / old["rounds_per_s"]
+        slower = speed < 1 - tolerance or new["init_s"] > old["init_s"] * (1 + tolerance) + 0.01
+        if slower:
+            regressions.append(name)
+        lines.append(f"{name:>30} | {new['rounds_per_s']:>10.1f} | {old['rounds_per_s']:>10.1f} | {speed:>6.2f} | "
+                     f"{new['init_s']:>8.3f} | {old['init_s']:>8.3f}" + ("   SLOWER" if slower else ""))
+    return lines, regressions
+
+
+def format_row(name, result):
+    rss = "n/a" if result["peak_rss_mib"] is None else f"{result['peak_rss_mib']:.0f} MiB"
+    alloc = "n/a" if result["alloc_kib_per_round"] is None else f"{result['alloc_kib_per_round']:.1f} KiB"
+    return (f"{name:>30}: init {result['init_s']:7.3f} s   {result['rounds_per_s']:9.1f} rounds/s   "
+            f"peak RSS {rss:>9}   alloc/round {alloc:>11}   blocks/round {result['blocks_per_round']:8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the simulation core.")
+    parser.add_argument("--filter", default="*", help="comma-separated scenario name patterns (fnmatch)")
+    parser.add_argument("--quick", action="store_true", help="only up to 1k validators and 100k delegators")
+    parser.add_argument("--rounds", type=int, default=200, help="timed rounds per scenario")
+    parser.add_argument("--traced-rounds", type=int, default=3, help="rounds measured with tracemalloc")
+    parser.add_argument("--delegation-events", action="store_true", help="Protocol(delegation_events=True)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown (default 0.2)")
+    parser.add_argument("--list", action="store_true", help="print the selected scenario names and exit")
+    args = parser.parse_args(argv)
+
+    patterns = args.filter.split(",")
+    names = [name for name in scenarios()
+             if any(fnmatch.fnmatch(name, p) for p in patterns)
+             and (not args.quick or any(fnmatch.fnmatch(name, p) for p in QUICK))]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    options = {}
+    if args.delegation_events:
+        options["delegation_events"] = True
+
+    results = run(names, args.rounds, args.traced_rounds, protocol_options=options)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline, args.tolerance)
+        print("\n".join(lines))
+        missing = [name for name in results["scenarios"] if name not in baseline["scenarios"]]
+        if missing:
+            print(f"{len(missing)} scenario(s) not in the baseline, not compared: {', '.join(missing)}")
+        if regressions:
+            print(f"{len(regressions)} scenario(s) slower than the baseline: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+from agents.byzantine import Byzantine
+
+
+class ValidatorSummary:
+    """Plain-data copy of a validator's final state (cheap to pickle between processes)."""
+
+    def __init__(self, validator):
+        self.id = validator.id
+        self.is_pool = validator.is_pool
+        self.is_byzantine = isinstance(validator, Byzantine)
+        self.stake = validator.stake
+        self.voting_power = validator.voting_power
+        self.overall_rewards = validator.overall_rewards
+        self.total_reward = validator.total_reward
+        self.apr = validator.apr
+        self.delegator_apr = validator.delegator_apr
+        self.score = validator.score
+        self.dcount = validator.dcount
+        self.leader_count = getattr(validator, "leader_count", 0)
+        self.attack_count = getattr(validator, "attack_count", 0)
+
+
+class WorldSummary:
+    """Final state of a World reduced to what the effectiveness / cost analysis needs."""
+
+    def __init__(self, world):
+        self.validators = [ValidatorSummary(v) for v in world.validators]
+        self.round_index = world.round_index
+        self.stop_reason = getattr(world, "stop_reason", None)
+
+    def pools(self):
+        return [v for v in self.validators if v.is_pool]
+
+
+def summarize_world(world):
+    if isinstance(world, WorldSummary):  # e.g. a run loaded from RunCache
+        return world
+    return WorldSummary(world)
+
+
+def attack_metrics(baseline, attack, attr="overall_rewards"):
+    """
+    Effectiveness / cost of an attack run against its baseline (both WorldSummary).
+
+    Returns a dict with:
+      effectiveness, max_eff_id  - max over pools of (U_base - U_attack) / (U_base * P_attacker)
+      cost, loss_victim_id       - attacker loss / loss of the pool that lost most
+      cost2, best_ally_id, ally_extra_reward
+                                 - net cost for attacker + the pool that gained most
+                                   (None when no pool gained from the attack)
+      plus the attacker's leader / attack counts and the per-pool delegator counts.
+    """
+    if baseline.round_index != attack.round_index:
+        raise ValueError(f"baseline ran to round {baseline.round_index} and attack to round {attack.round_index}; "
+                         "runs stopped early must be paired (run_paired_simulation)")
+    utility_baseline = {}
+    delegators_baseline = {}
+    attacker_baseline = None
+    for validator in baseline.validators:
+        if validator.is_byzantine:
+            attacker_baseline = validator
+        elif validator.is_pool:
+            utility_baseline[validator.id] = getattr(validator, attr)
+            delegators_baseline[validator.id] = validator.dcount
+
+    utility_attack = {}
+    delegators_attack = {}
+    attacker_attack = None
+    for validator in attack.validators:
+        if validator.is_byzantine:
+            attacker_attack = validator
+        elif validator.is_pool:
+            utility_attack[validator.id] = getattr(validator, attr)
+            delegators_attack[validator.id] = validator.dcount
+
+    P_attacker = attacker_attack.voting_power
+
+    eff_values = {}
+    for v_id, utility_value in utility_baseline.items():
+        eff_values[v_id] = (utility_value - utility_attack[v_id]) / (utility_value * P_attacker)
+    max_eff_id = max(eff_values, key=eff_values.get)  # id of validator for which effectiveness is max
+
+    losses = {}
+    for v_id, utility_value in utility_baseline.items():
+        losses[v_id] = utility_value - utility_attack[v_id]
+    loss_victim_id = max(losses, key=losses.get)  # id of validator for which loss is max
+    attacker_loss = getattr(attacker_baseline, attr) - getattr(attacker_attack, attr)
+    victim_loss = losses[loss_victim_id]
+
+    # -------------------------
+    # ALLIED POOL ANALYSIS
+    # -------------------------
+    # Identify the pool that benefited most from the attack (captured migrating
+    # delegators). Compute adjusted metrics for the hypothetical combined entity
+    # (Byzantine attacker + allied pool operator = same economic actor).
+    #
+    # cost2 < 0  → attack was NET PROFITABLE for the combined entity
+    # cost2 ∈ (0, cost) → still a net cost, but lower than cost alone
+    ally_gains = {}
+    for v_id, baseline_reward in utility_baseline.items():
+        extra = utility_attack[v_id] - baseline_reward
+        if extra > 0:
+            ally_gains[v_id] = extra
+
+    best_ally_id = None
+    ally_extra_reward = None
+    cost2 = None
+    if ally_gains:
+        best_ally_id = max(ally_gains, key=ally_gains.get)
+        ally_extra_reward = ally_gains[best_ally_id]
+        # Net cost to combined entity: negative means the attack was profitable
+        cost2 = (attacker_loss - ally_extra_reward) / victim_loss
+
+    return {
+        "effectiveness": eff_values[max_eff_id],
+        "max_eff_id": max_eff_id,
+        "cost": attacker_loss / victim_loss,
+        "loss_victim_id": loss_victim_id,
+        "cost2": cost2,
+        "best_ally_id": best_ally_id,
+        "ally_extra_reward": ally_extra_reward,
+        "attacker_leader_count_baseline": attacker_baseline.leader_count,
+        "attacker_attack_count_baseline": attacker_baseline.attack_count,
+        "attacker_leader_count_attack": attacker_attack.leader_count,
+        "attacker_attack_count_attack": attacker_attack.attack_count,
+        "delegators_baseline": delegators_baseline,
+        "delegators_attack": delegators_attack,
+    }
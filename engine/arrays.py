@@ -0,0 +1,90 @@
+import numpy as np
+
+
+class ValidatorArrays:
+    """
+    Struct-of-arrays copy of the per-validator state that MacroStepper updates for K rounds
+    at once: row i holds the state of world.validators[i].
+
+    The Validator objects stay the state of record. A macro step loads their state into
+    arrays (ValidatorArrays(world.validators)), applies the K rounds' uptime, reward and APR
+    updates as vector operations, and writes the result back with store(), so one load and
+    one store are paid per macro step rather than per round.
+    """
+
+    def __init__(self, validators):
+        self.validators = validators
+        self.stake = np.array([v.stake for v in validators], dtype=float)
+        self.voting_power = np.array([v.voting_power for v in validators], dtype=float)
+        self.overall_rewards = np.array([v.overall_rewards for v in validators], dtype=float)
+        self.total_reward = np.array([v.total_reward for v in validators], dtype=float)
+        self.last_overall_rewards = np.array([v._last_overall_rewards for v in validators], dtype=float)
+        self.ema_return = np.array([v._ema_return for v in validators], dtype=float)
+        self.apr = np.array([v.apr for v in validators], dtype=float)
+        self.delegator_apr = np.array([v.delegator_apr for v in validators], dtype=float)
+        self.uptime = np.array([v._ema_uptime for v in validators], dtype=float)
+        self.reward_per_stake = np.array([v._reward_per_stake for v in validators], dtype=float)
+
+        self.alpha = np.array([v._alpha_ema for v in validators], dtype=float)
+        self.commission_rate = np.array([v.commission_rate for v in validators], dtype=float)
+        # commission is only taken by pools (see Validator.update_reward)
+        self.commission_taken = np.array([v.commission_rate if v.is_pool else 0.0 for v in validators], dtype=float)
+
+    def store(self):
+        """Write the arrays back to the Validator objects."""
+        for v, overall, total, last, ema, apr, delegator_apr, uptime, per_stake in zip(
+                self.validators, self.overall_rewards.tolist(), self.total_reward.tolist(),
+                self.last_overall_rewards.tolist(), self.ema_return.tolist(), self.apr.tolist(),
+                self.delegator_apr.tolist(), self.uptime.tolist(), self.reward_per_stake.tolist()):
+            v.overall_rewards = overall
+            v.total_reward = total
+            v._last_overall_rewards = last
+            v._ema_return = ema
+            v.apr = apr
+            v.delegator_apr = delegator_apr
+            v._ema_uptime = uptime
+            v.score = uptime
+            v._reward_per_stake = per_stake
+
+    def credit(self, reward):
+        """Vector form of Validator.update_reward: credit reward[i] to validator i."""
+        self.overall_rewards += reward
+
+        commission = reward * self.commission_taken
+        distributable = reward - commission
+        self.total_reward += commission + distributable * (self.stake / self.voting_power)
+        self.reward_per_stake += distributable / self.voting_power
+
+    def update_uptime_many(self, signed):
+        """
+        update_uptime for K rounds at once; signed is the (K, V) mask of every round's
+        selected voters. The EMA after K steps in closed form:
+            (1 - alpha)^K * uptime + alpha * sum_k (1 - alpha)^(K-1-k) * signed[k]
+        """
+        decay = _decay_weights(1.0 - self.alpha, len(signed))
+        self.uptime *= (1.0 - self.alpha) ** len(signed)
+        self.uptime += self.alpha * (decay * signed).sum(axis=0)
+
+    def update_apr_many(self, rewards, rounds_per_year):
+        """
+        update_apr after each of K rounds whose rewards (K, V) were credited together
+        (credit(rewards.sum(axis=0))): the per-round returns rewards[k] / voting_power enter
+        the EMA in closed form, as in update_uptime_many. Voting power must not change in between.
+        """
+        self.last_overall_rewards[:] = self.overall_rewards
+        active = self.voting_power > 0
+        decay = _decay_weights(1.0 - self.alpha, len(rewards))
+        r = np.divide(rewards, self.voting_power, out=np.zeros_like(rewards), where=active)
+        ema = (1.0 - self.alpha) ** len(rewards) * self.ema_return + self.alpha * (decay * r).sum(axis=0)
+        self.ema_return[active] = ema[active]
+        self._set_apr(rounds_per_year, active)
+
+    def _set_apr(self, rounds_per_year, active):
+        np.multiply(self.ema_return, rounds_per_year, out=self.apr)
+        self.apr[~active] = 0.0
+        np.multiply(self.apr, 1.0 - self.commission_rate, out=self.delegator_apr)
+
+
+def _decay_weights(decay, k):
+    """(k, V) weights decay^(k-1-j) of row j: how much of step j is left after step k-1"""
+    return decay[np.newaxis, :] ** np.arange(k - 1, -1, -1, dtype=float)[:, np.newaxis]
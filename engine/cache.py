@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+# simulator source that a cached result depends on (relative to the repository root)
+_SOURCE_DIRS = ("agents", "engine", "model", "setups")
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_source_fingerprint = None
+
+
+def source_fingerprint():
+    """sha256 over the simulator source files; any code change invalidates every cached run."""
+    global _source_fingerprint
+    if _source_fingerprint is None:
+        h = hashlib.sha256()
+        for directory in _SOURCE_DIRS:
+            folder = os.path.join(_ROOT, directory)
+            for name in sorted(os.listdir(folder)):
+                if name.endswith(".py"):
+                    h.update(f"{directory}/{name}".encode())
+                    with open(os.path.join(folder, name), "rb") as f:
+                        h.update(f.read())
+        _source_fingerprint = h.hexdigest()
+    return _source_fingerprint
+
+
+def _describe(value):
+    """
+    JSON-able description of a configuration value (policies are described by class + parameters;
+    underscore attributes are runtime state such as draw buffers and are left out).
+    """
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return [_describe(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _describe(v) for k, v in value.items()}
+    attributes = {k: _describe(v) for k, v in vars(value).items() if k != "rng" and not k.startswith("_")}
+    return {"class": f"{type(value).__module__}.{type(value).__qualname__}", "attributes": attributes}
+
+
+class RunCache:
+    """
+    On-disk cache of finished runs: {key: (WorldSummary, Metrics.history)}.
+
+    key = sha256(configuration, simulator source fingerprint), so any change to the
+    inputs (setup policies and seed included) or to the simulator code misses.
+    The directory is kept under max_bytes by evicting the least recently used entries.
+    """
+
+    def __init__(self, directory=os.path.join(".cache", "runs"), max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, config):
+        description = json.dumps({"config": _describe(config), "source": source_fingerprint()}, sort_keys=True)
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def load(self, key):
+        """Return (summary, history) or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(path)  # mark as recently used
+        return entry
+
+    def store(self, key, summary, history):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((summary, history), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))  # atomic: readers never see a partial entry
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
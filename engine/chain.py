@@ -0,0 +1,141 @@
+from collections import deque
+
+import numpy as np
+
+
+class _NoBlocks:
+    """Block container that keeps nothing."""
+
+    def append(self, block):
+        pass
+
+    def __len__(self):
+        return 0
+
+    def __iter__(self):
+        return iter(())
+
+
+class _BlockCount(_NoBlocks):
+    """Block container that only counts."""
+
+    def __init__(self):
+        self.count = 0
+
+    def append(self, block):
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+
+class ChainRetention:
+    """
+    What a run keeps of the blocks it produces: world.blockchain (confirmed blocks) and
+    every Validator.proposed_blocks. Nothing in the simulation reads blocks back, yet each
+    one keeps its Committee (validator list, votes) alive, so a long run grows without bound.
+
+    This base policy keeps every block in lists, as without a policy. Pass a subclass to
+    Protocol(chain_retention=...):
+        NoRetention()      keep nothing
+        CountRetention()   keep block counts only (len() of the containers)
+        RingRetention(k)   keep the last k blocks of the chain and of every validator
+        RecordRetention()  keep counts, plus a compact record per round
+                           (proposer index, included power, confirmed flag)
+    """
+
+    keeps_blocks = True # False: no block outlives its round, so Protocol can reuse one Committee and Block
+
+    def bind(self, world):
+        world.blockchain = self.container()
+        for v in world.validators:
+            v.proposed_blocks = self.container()
+
+    def container(self):
+        return []
+
+    def on_round(self, round_index, committee, block):
+        """Called once per round; block is None when the proposal was not confirmed."""
+        pass
+
+    def on_rounds(self, world, first_round, proposers, included_power, confirmed):
+        """
+        Called for K rounds simulated at once without blocks (engine/macro.py): proposers (K,)
+        indices into world.validators, included_power (K,), confirmed (K,) flags.
+        Only policies that keep no blocks can follow them.
+        """
+        raise ValueError(f"{type(self).__name__} keeps blocks; macro steps produce none")
+
+
+class NoRetention(ChainRetention):
+    keeps_blocks = False
+
+    def container(self):
+        return _NoBlocks()
+
+    def on_rounds(self, world, first_round, proposers, included_power, confirmed):
+        pass
+
+
+class CountRetention(ChainRetention):
+    keeps_blocks = False
+
+    def container(self):
+        return _BlockCount()
+
+    def on_rounds(self, world, first_round, proposers, included_power, confirmed):
+        world.blockchain.count += int(np.count_nonzero(confirmed))
+        counts = np.bincount(proposers, minlength=len(world.validators))
+        for v, count in zip(world.validators, counts.tolist()):
+            v.proposed_blocks.count += count
+
+
+class RingRetention(ChainRetention):
+    def __init__(self, k):
+        self.k = k
+
+    def container(self):
+        return deque(maxlen=self.k)
+
+
+class RecordRetention(CountRetention):
+    """Counts plus one (round, proposer, included_power, confirmed) record per round; see records()."""
+    RECORD = np.dtype([("round", np.int64), ("proposer", np.int32), ("included_power", np.float64),
+                       ("confirmed", np.bool_)])
+
+    def __init__(self, chunk_size=4096):
+        self.chunk_size = chunk_size
+        self.size = 0
+        self._records = np.zeros(0, dtype=self.RECORD)
+        self._validator_index = {}
+
+    def bind(self, world):
+        super().bind(world)
+        self._validator_index = {v: index for index, v in enumerate(world.validators)}
+
+    def on_round(self, round_index, committee, block):
+        if self.size == len(self._records):
+            grown = np.zeros(len(self._records) + max(self.chunk_size, len(self._records) // 2), dtype=self.RECORD)
+            grown[:self.size] = self._records[:self.size]
+            self._records = grown
+        self._records[self.size] = (round_index, self._validator_index[committee.proposer],
+                                    committee.included_power, block is not None)
+        self.size += 1
+
+    def on_rounds(self, world, first_round, proposers, included_power, confirmed):
+        super().on_rounds(world, first_round, proposers, included_power, confirmed)
+        k = len(proposers)
+        if self.size + k > len(self._records):
+            grown = np.zeros(self.size + k + max(self.chunk_size, (self.size + k) // 2), dtype=self.RECORD)
+            grown[:self.size] = self._records[:self.size]
+            self._records = grown
+        records = self._records[self.size:self.size + k]
+        records["round"] = np.arange(first_round, first_round + k)
+        records["proposer"] = proposers
+        records["included_power"] = included_power
+        records["confirmed"] = confirmed
+        self.size += k
+
+    def records(self):
+        """structured array view: one record per round (proposer = index in world.validators)"""
+        return self._records[:self.size]
@@ -0,0 +1,57 @@
+class ConvergenceStop:
+    """
+    Stopping rule for Protocol.run: end the run once the pools have settled, judged on the
+    metrics snapshots (one per Metrics window).
+
+    A window is calm when, for every pool,
+      - the voting-power share changed by at most `tolerance` (relative) since the previous snapshot,
+      - the window's net delegator flow is at most `flow_tolerance` of the pool's delegators.
+    The run stops at the snapshot that completes `windows` calm windows in a row, but never
+    before round `min_rounds`. Protocol copies the rule for every run; the stop round and reason
+    are kept on the World (world.stop_reason, world.round_index).
+    """
+
+    def __init__(self, tolerance=1e-3, windows=5, min_rounds=0, flow_tolerance=None):
+        self.tolerance = tolerance
+        self.flow_tolerance = tolerance if flow_tolerance is None else flow_tolerance
+        self.windows = windows
+        self.min_rounds = min_rounds
+        self.bind()
+
+    def bind(self):
+        """Forget the windows seen so far (called by Protocol when a run starts)."""
+        self._previous_shares = None
+        self._calm_windows = 0
+        self._reason = None
+
+    @property
+    def reason(self):
+        """Why the run stopped, or None while it has not."""
+        return self._reason
+
+    def observe(self, snap):
+        """Feed one Metrics snapshot; True once the run should stop."""
+        if self._reason is not None:
+            return True
+        total = snap["total_voting_power"]
+        pool_stats = snap["pool_stats"]
+        shares = {pool_id: stats["voting_power"] / total for pool_id, stats in pool_stats.items()}
+        previous = self._previous_shares
+        self._previous_shares = shares
+        if previous is None:
+            return False
+
+        share_change = max((abs(share - previous[pool_id]) / previous[pool_id] if previous[pool_id] else abs(share)
+                            for pool_id, share in shares.items()), default=0.0)
+        flow = max((abs(stats["net_flow"]) / max(stats["delegators"], 1) for stats in pool_stats.values()),
+                   default=0.0)
+        if share_change <= self.tolerance and flow <= self.flow_tolerance:
+            self._calm_windows += 1
+        else:
+            self._calm_windows = 0
+
+        if self._calm_windows >= self.windows and snap["round"] >= self.min_rounds:
+            self._reason = (f"converged at round {snap['round']}: {self._calm_windows} windows with VP share "
+                            f"change <= {self.tolerance:g} and net flow <= {self.flow_tolerance:g} of delegators")
+            return True
+        return False
@@ -0,0 +1,447 @@
+import bisect
+import math
+import random
+
+import numpy as np
+
+
+class DelegatorArrays:
+    """
+    Struct-of-arrays form of the delegators' decision state, so Protocol.update_delegations
+    evaluates Delegator.choose_validator_by_apr for all delegators at once.
+
+    Per delegator: apr_gap_threshold, star threshold (apr_gap_threshold * star_gap_multiplier),
+    pull_prob, loyalty, streak_required, dissatisfied_streak and the index of its pool.
+    Every round the best pool and the gaps are computed once; delegators whose decision
+    cannot depend on their random number (no pull possible, streak not reaching
+    streak_required) get their streak updated as a vector operation. The others are compared
+    with their random numbers as a vector too, and only those who pick a pool reach Python.
+
+    The decisions are exactly those of choose_validator_by_apr, including the random numbers:
+    every delegator still takes one rng.random() in delegator order, and pool choices draw
+    from choice_rng / rng in between as before. The numbers are read ahead from a copy of rng
+    (_uniforms); rng itself is advanced with getrandbits, which consumes the generator exactly
+    like the same count of rng.random() calls, only up to each pool choice and at the end.
+
+    Requires all delegators to share one rng (as initialize_world and RandomStreams set them
+    up); see build(). Bindings must change only through scheduled migrations. The streaks
+    are kept here; sync() writes them back to Delegator.dissatisfied_streak.
+    """
+
+    def __init__(self, delegators, pools):
+        self.delegators = delegators
+        self.pools = pools
+        self.index = {d: i for i, d in enumerate(delegators)}
+        self.pool_index = {v: p for p, v in enumerate(pools)}
+        self.rng = delegators[0].rng
+        # pool choices (_pick_logit) draw from rng too, between the delegators' decision numbers
+        self.choice_from_rng = delegators[0].choice_rng is None or delegators[0].choice_rng is self.rng
+        self.apr_gap_threshold = np.array([d.apr_gap_threshold for d in delegators], dtype=float)
+        self.star_threshold = self.apr_gap_threshold * np.array([d.star_gap_multiplier for d in delegators], dtype=float)
+        self.pull_prob = np.array([d.pull_prob for d in delegators], dtype=float)
+        self.loyalty = np.array([d.loyalty for d in delegators], dtype=float)
+        self.streak_required = np.array([d.streak_required for d in delegators], dtype=np.int64)
+        self.streak = np.array([d.dissatisfied_streak for d in delegators], dtype=np.int64)
+        self.bound = np.array([self._bound_index(d) for d in delegators], dtype=np.int64)
+        self.pending = np.zeros(len(delegators), dtype=bool)
+
+    @classmethod
+    def build(cls, world):
+        """DelegatorArrays for the world, or None if its delegators do not share one rng."""
+        delegators = world.delegators
+        if not delegators:
+            return None
+        first = delegators[0]
+        if any(d.rng is not first.rng or d.choice_rng is not first.choice_rng for d in delegators):
+            return None
+        if not isinstance(first.rng, random.Random) and first.rng is not random:
+            return None
+        if not _uniforms_match_random():
+            return None
+        return cls(delegators, world.pools())
+
+    def sync(self):
+        """Write the streaks back to the Delegator objects."""
+        for d, streak in zip(self.delegators, self.streak.tolist()):
+            d.dissatisfied_streak = streak
+
+    def _bound_index(self, delegator):
+        return self.pool_index.get(delegator.bounded_validator, -1)
+
+    def _update_pending(self, pending_delegators):
+        """Mark pending delegators; re-read the pool of those whose migration has been executed."""
+        pending = np.zeros(len(self.delegators), dtype=bool)
+        pending[[self.index[d] for d in pending_delegators]] = True
+        for i in np.flatnonzero(self.pending & ~pending).tolist():
+            self.bound[i] = self._bound_index(self.delegators[i])
+        self.pending = pending
+
+    def decide(self, pending_delegators, draw_pending=False):
+        """
+        One round of choose_validator_by_apr for every delegator without a pending migration.
+        draw_pending: pending delegators still take their random number (common random numbers).
+        Returns [(delegator, old, new)] for the delegators that switch, in delegator order.
+        """
+        self._update_pending(pending_delegators)
+        apr = np.array([v.delegator_apr for v in self.pools], dtype=float)
+        best_apr = apr.max()
+
+        active = ~self.pending
+        bound = self.bound >= 0
+        gap = best_apr - apr[self.bound]
+        pull = (self.pull_prob > 0.0) & (gap > self.star_threshold) & bound
+        over = (gap > self.apr_gap_threshold) & bound
+        streak = np.where(over, self.streak + 1, 0)
+        # delegators whose decision depends on their random number
+        undecided = active & (~bound | pull | (over & (streak >= self.streak_required)))
+
+        # everyone else stays; their streak is known already
+        settled = active & ~undecided
+        self.streak[settled] = streak[settled]
+
+        draws = active | self.pending if draw_pending else active
+        total_draws = int(np.count_nonzero(draws))
+        rows = np.flatnonzero(undecided)
+        rng = self.rng
+        if not len(rows):
+            if total_draws:
+                rng.getrandbits(64 * total_draws)
+            return []
+
+        # the next random numbers of rng (a pool choice from rng takes one of them too)
+        stream = _uniforms(rng, total_draws + (len(rows) if self.choice_from_rng else 0))
+        position = (np.cumsum(draws) - 1)[rows]
+        unbound = ~bound[rows]
+        can_pull = pull[rows]
+        can_flee = over[rows] & (streak[rows] >= self.streak_required[rows])
+        pull_prob = self.pull_prob[rows]
+        loyalty = self.loyalty[rows]
+        pulled = np.zeros(len(rows), dtype=bool)
+        picked = []
+        first = 0
+        while first < len(rows):
+            r = stream[position[first:]]
+            pulled[first:] = unbound[first:] | (can_pull[first:] & (r < pull_prob[first:]))
+            picks = first + np.flatnonzero(pulled[first:] | (can_flee[first:] & (r >= loyalty[first:])))
+            if not self.choice_from_rng:
+                # pool choices do not move the numbers: every pick is known already
+                picked.extend(picks.tolist())
+                break
+            if not len(picks):
+                break
+            # this delegator's pool choice takes the next number; the later delegators' move by one
+            k = int(picks[0])
+            picked.append(k)
+            position[k + 1:] += 1
+            first = k + 1
+
+        # a pull (or a first choice) leaves the streak alone; otherwise it is updated as usual
+        fleeing = rows[~pulled]
+        self.streak[fleeing] = streak[fleeing]
+
+        switches = []
+        consumed = 0 # random numbers taken from rng itself so far
+        for k in picked:
+            if self.choice_from_rng:
+                # rng up to and including this delegator's number, so _pick_logit draws the next one
+                rng.getrandbits(64 * (int(position[k]) + 1 - consumed))
+                consumed = int(position[k]) + 2
+            d = self.delegators[rows[k]]
+            current = d.bounded_validator
+            new = d._pick_logit(self.pools, current=current)
+            if new != current:
+                switches.append((d, current, new))
+                # pending from now on (the caller schedules it), so its pool is re-read once the
+                # migration has been executed, even if that happens before the next decide()
+                self.pending[rows[k]] = True
+        remaining = total_draws + (len(picked) if self.choice_from_rng else 0) - consumed
+        if remaining:
+            rng.getrandbits(64 * remaining)
+        return switches
+
+
+class DelegatorEvents:
+    """
+    Event-driven form of Protocol.update_delegations: a delegator is only looked at when its
+    state can change, so a round costs O(pools + state changes) instead of O(delegators).
+
+    Each pool keeps its delegators sorted by apr_gap_threshold and by star threshold
+    (apr_gap_threshold * star_gap_multiplier). With the pool's gap (best delegator_apr minus
+    its own) the dissatisfied delegators are a prefix of the first list and the ones a star
+    pool can pull a prefix of the second; a round only walks the delegators whose threshold
+    the gap crossed since the previous round. A dissatisfied run that started at round
+    `since` reaches streak_required at round since + streak_required - 1, so the streak is
+    never counted round by round.
+
+    The per-round coin flips of choose_validator_by_apr become geometric waiting times: a
+    pull with probability pull_prob per round while the gap exceeds the star threshold, and
+    a flee with probability 1 - loyalty per round once the streak is due (conditioned on no
+    pull while both apply, as with the one random number of choose_validator_by_apr). The
+    flee time is only drawn when the streak is due, so streaks that break earlier cost no
+    random numbers. Events are filed by round in a calendar and dropped when the state they
+    were filed for changed in between (the delegator's pull / flee epoch moved on).
+
+    The decisions follow the same per-round probabilities as choose_validator_by_apr, but the
+    random numbers are drawn differently, so a run is not identical to one without events
+    (nor do paired runs share the delegators' numbers). decide() must be called every round
+    and bindings must change only through the migrations it returns, executed at their
+    execute_round.
+    """
+    # order within a round: a pull is decided before a flee, as in choose_validator_by_apr
+    PULL = 0
+    DUE = 1 # the streak reaches streak_required: draw the flee time
+    FLEE = 2
+
+    def __init__(self, world):
+        self.world = world
+        self.delegators = world.delegators
+        self.pools = world.pools()
+        self.pool_index = {v: p for p, v in enumerate(self.pools)}
+        n = len(self.delegators)
+        self.gap = [-math.inf] * len(self.pools) # gap of every pool in the last round
+        self.gap_keys = [[] for _ in self.pools] # (apr_gap_threshold, delegator) of every pool, sorted
+        self.star_keys = [[] for _ in self.pools] # (star threshold, delegator) of delegators with pull_prob > 0
+        self.over_count = [0] * len(self.pools) # gap_keys below the gap: the dissatisfied delegators
+        self.star_count = [0] * len(self.pools)
+        self.pool_of = [-1] * n # -1: pending migration or not bound
+        self.running = [False] * n # dissatisfied (streak counting)
+        self.since = [0] * n # round the streak would have been 1 in
+        self.starred = [False] * n # gap above the star threshold
+        self.carry = [d.dissatisfied_streak for d in self.delegators] # streak kept while not in a pool
+        self.pull_epoch = [0] * n
+        self.flee_epoch = [0] * n
+        self.calendar = {} # round -> [(kind, delegator, epoch)]
+        self.returning = {} # execute_round -> delegators whose migration is executed then
+        self.unbound = []
+        self.started = False
+        self.last_round = None
+
+    def decide(self, round_index, execute_round):
+        """
+        Delegators that decide to move in this round; returns [(delegator, old, new)] for
+        migrations to be executed at execute_round.
+        """
+        t = round_index
+        if not self.started:
+            self._start()
+        apr = [v.delegator_apr for v in self.pools]
+        best_apr = max(apr)
+        returning = self.returning.pop(t, ())
+        for i in returning:
+            self._enter(i, t)
+        for p, pool_apr in enumerate(apr):
+            self._cross(p, best_apr - pool_apr, t)
+        for i in returning:
+            self.carry[i] = 0 # a streak kept through the migration only continues if the new pool is behind too
+
+        switches = []
+        unbound, self.unbound = self.unbound, []
+        for i in unbound:
+            d = self.delegators[i]
+            new = d._pick_logit(self.pools, current=None)
+            switches.append((d, None, new))
+            self._leave(i, execute_round, 0)
+
+        events = self.calendar.get(t)
+        if events:
+            events.sort() # stays filed while it is walked, so flees drawn for this round are appended to it
+            k = 0
+            while k < len(events):
+                kind, i, epoch = events[k]
+                k += 1
+                if epoch != (self.pull_epoch[i] if kind == self.PULL else self.flee_epoch[i]):
+                    continue
+                if kind == self.DUE:
+                    self._schedule_flee(i, t)
+                    continue
+                d = self.delegators[i]
+                current = d.bounded_validator
+                new = d._pick_logit(self.pools, current=current)
+                if new != current:
+                    switches.append((d, current, new))
+                    # a pull leaves the streak as it was before this round
+                    streak = t - self.since[i] + (kind == self.FLEE) if self.running[i] else 0
+                    self._leave(i, execute_round, streak)
+                    continue
+                if kind == self.PULL and self.running[i]:
+                    self.since[i] += 1
+                # one decision per round: both waiting times start again next round
+                self._schedule_pull(i, t + 1)
+                self._schedule_flee(i, t + 1)
+        self.calendar.pop(t, None)
+        self.last_round = t
+        return switches
+
+    def sync(self):
+        """Write the streaks back to the Delegator objects."""
+        if self.last_round is None:
+            return
+        for i, d in enumerate(self.delegators):
+            d.dissatisfied_streak = self.last_round - self.since[i] + 1 if self.running[i] else self.carry[i]
+
+    def _start(self):
+        self.started = True
+        index = {d: i for i, d in enumerate(self.delegators)}
+        for execute_round, migrations in self.world.pending_migrations.items():
+            self.returning.setdefault(execute_round, []).extend(index[d] for d, _, _ in migrations)
+        pending = self.world._pending_delegator_set
+        for i, d in enumerate(self.delegators):
+            if d in pending:
+                continue
+            p = self.pool_index.get(d.bounded_validator, -1)
+            if p < 0:
+                self.unbound.append(i)
+                continue
+            self.pool_of[i] = p
+            self.gap_keys[p].append((d.apr_gap_threshold, i))
+            if d.pull_prob > 0.0:
+                self.star_keys[p].append((d.apr_gap_threshold * d.star_gap_multiplier, i))
+        for keys in self.gap_keys + self.star_keys:
+            keys.sort()
+
+    def _cross(self, p, gap, t):
+        """Start / end the streaks and star periods of pool p's delegators whose threshold gap crossed."""
+        self.gap[p] = gap
+        keys = self.gap_keys[p]
+        old, new = self.over_count[p], bisect.bisect_left(keys, (gap,))
+        for _, i in keys[old:new]:
+            self.running[i] = True
+            self.since[i] = t - self.carry[i]
+            self.carry[i] = 0
+            self._schedule_flee(i, t)
+        for _, i in keys[new:old]:
+            self.running[i] = False
+            self.carry[i] = 0
+            self.flee_epoch[i] += 1
+        self.over_count[p] = new
+
+        keys = self.star_keys[p]
+        old, new = self.star_count[p], bisect.bisect_left(keys, (gap,))
+        changed = keys[old:new] if new > old else keys[new:old]
+        for _, i in changed:
+            self.starred[i] = new > old
+            self._schedule_pull(i, t)
+            if self.running[i] and self._due(i) < t:
+                self._schedule_flee(i, t) # the flee probability depends on whether a pull is possible
+        self.star_count[p] = new
+
+    def _due(self, i):
+        return self.since[i] + self.delegators[i].streak_required - 1
+
+    def _schedule_pull(self, i, t):
+        """File the next pull (>= round t) of delegator i if it is starred; earlier ones become stale."""
+        self.pull_epoch[i] += 1
+        if self.starred[i]:
+            wait = _waiting_rounds(self.delegators[i].rng, self.delegators[i].pull_prob)
+            if wait is not None:
+                self._file(t + wait, self.PULL, i, self.pull_epoch[i])
+
+    def _schedule_flee(self, i, t):
+        """File the next flee (>= round t) of delegator i if it is dissatisfied; earlier ones become stale."""
+        self.flee_epoch[i] += 1
+        if not self.running[i]:
+            return
+        due = self._due(i)
+        if due > t:
+            self._file(due, self.DUE, i, self.flee_epoch[i])
+            return
+        d = self.delegators[i]
+        flee_prob = 1.0 - d.loyalty
+        if self.starred[i]:
+            # no pull this round: the number was >= pull_prob, and it must be >= loyalty too
+            flee_prob = 0.0 if d.pull_prob >= 1.0 else (1.0 - max(d.pull_prob, d.loyalty)) / (1.0 - d.pull_prob)
+        wait = _waiting_rounds(d.rng, flee_prob)
+        if wait is not None:
+            self._file(t + wait, self.FLEE, i, self.flee_epoch[i])
+
+    def _file(self, t, kind, i, epoch):
+        self.calendar.setdefault(t, []).append((kind, i, epoch))
+
+    def _enter(self, i, t):
+        """Delegator i is back in a pool (its migration has been executed)."""
+        d = self.delegators[i]
+        p = self.pool_index.get(d.bounded_validator, -1)
+        if p < 0:
+            self.unbound.append(i)
+            return
+        self.pool_of[i] = p
+        gap = self.gap[p]
+        # placed as for the previous round's gap; _cross then moves it with the others
+        threshold = d.apr_gap_threshold
+        bisect.insort(self.gap_keys[p], (threshold, i))
+        if threshold < gap:
+            self.over_count[p] += 1
+            self.running[i] = True
+            self.since[i] = t - self.carry[i]
+            self.carry[i] = 0
+        if d.pull_prob > 0.0:
+            threshold *= d.star_gap_multiplier
+            bisect.insort(self.star_keys[p], (threshold, i))
+            if threshold < gap:
+                self.star_count[p] += 1
+                self.starred[i] = True
+        self._schedule_pull(i, t)
+        self._schedule_flee(i, t)
+
+    def _leave(self, i, execute_round, streak):
+        """Delegator i has a pending migration: out of its pool until execute_round."""
+        d = self.delegators[i]
+        p = self.pool_of[i]
+        if p >= 0:
+            threshold = d.apr_gap_threshold
+            self.over_count[p] -= _remove(self.gap_keys[p], (threshold, i), self.over_count[p])
+            if d.pull_prob > 0.0:
+                threshold *= d.star_gap_multiplier
+                self.star_count[p] -= _remove(self.star_keys[p], (threshold, i), self.star_count[p])
+        self.pool_of[i] = -1
+        self.running[i] = False
+        self.starred[i] = False
+        self.carry[i] = streak
+        self.pull_epoch[i] += 1
+        self.flee_epoch[i] += 1
+        self.returning.setdefault(execute_round, []).append(i)
+
+
+def _remove(keys, key, count):
+    """Remove key from the sorted keys; 1 if it was one of the first count keys."""
+    pos = bisect.bisect_left(keys, key)
+    del keys[pos]
+    return 1 if pos < count else 0
+
+
+def _waiting_rounds(rng, prob):
+    """Rounds until an event of per-round probability prob (0: this round), None if never."""
+    if prob <= 0.0:
+        return None
+    if prob >= 1.0:
+        return 0
+    return int(math.log(1.0 - rng.random()) / math.log1p(-prob))
+
+
+def _uniforms(rng, n):
+    """The next n values of rng.random(), without consuming them from rng."""
+    clone = random.Random()
+    clone.setstate(rng.getstate())
+    words = np.frombuffer(clone.getrandbits(64 * n).to_bytes(8 * n, "little"), dtype="<u4")
+    # random.random(): 27 bits of the first word and 26 of the second
+    return ((words[0::2] >> 5) * 67108864.0 + (words[1::2] >> 6)) * (1.0 / 9007199254740992.0)
+
+
+_UNIFORMS_CHECKED = None
+
+
+def _uniforms_match_random():
+    """
+    Whether _uniforms reproduces this interpreter's random.random() and getrandbits advances
+    the generator like random() calls (CPython's Mersenne Twister); checked once per process.
+    DelegatorArrays.build falls back to the per-delegator loop when it does not.
+    """
+    global _UNIFORMS_CHECKED
+    if _UNIFORMS_CHECKED is None:
+        rng = random.Random(20240229)
+        expected = [rng.random() for _ in range(64)] + [rng.random()]
+        rng.seed(20240229)
+        read_ahead = _uniforms(rng, 64).tolist()
+        rng.getrandbits(64 * 64)
+        _UNIFORMS_CHECKED = read_ahead == expected[:64] and rng.random() == expected[64]
+    return _UNIFORMS_CHECKED
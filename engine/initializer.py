@@ -1,5 +1,6 @@
 import random
 import math
+import itertools
 from agents.byzantine import Byzantine
 from engine.world import World  # adjust import if your World lives elsewhere
 from agents.validator import Validator
@@ -14,14 +15,14 @@ from agents.delegator import Delegator
 #
 # Dirichlet distributions are standard for modeling market shares,
 # stake distributions, and resource allocation under uncertainty.
-def _random_positive_vector(n, alpha=1.0):
+def _random_positive_vector(n, alpha=1.0, rng=random):
     # Gamma draws -> Dirichlet-like when normalized
-    xs = [random.gammavariate(alpha, 1.0) for _ in range(n)]
+    xs = [rng.gammavariate(alpha, 1.0) for _ in range(n)]
     s = sum(xs)
     return [x / s for x in xs]
 
 
-def _get_shares(total, n, max_stake, min_stake=0.001, alpha=1.0, max_iter=10_000):
+def _get_shares(total, n, max_stake, min_stake=0.001, alpha=1.0, max_iter=10_000, rng=random):
     """
     Returns n nonnegative shares that sum to `total` and each <= cap.
     Simple rejection + fallback redistribution.
@@ -40,13 +41,13 @@ def _get_shares(total, n, max_stake, min_stake=0.001, alpha=1.0, max_iter=10_000
 
     # Rejection sampling is fine for thesis-scale n.
     for _ in range(max_iter):
-        shares_unit = _random_positive_vector(n, alpha=alpha)
+        shares_unit = _random_positive_vector(n, alpha=alpha, rng=rng)
         shares = [remaining * x for x in shares_unit]
         if max(shares) <= cap_remaining + 1e-12:
             return [min_stake + r for r in shares]
 
     # Fallback: max_stake then renormalize remaining mass iteratively
-    shares = [remaining * x for x in _random_positive_vector(n, alpha=alpha)]
+    shares = [remaining * x for x in _random_positive_vector(n, alpha=alpha, rng=rng)]
     for _ in range(n * 5):
         over = [i for i, s in enumerate(shares) if s > cap_remaining]
         if not over:
@@ -82,8 +83,8 @@ def _get_shares(total, n, max_stake, min_stake=0.001, alpha=1.0, max_iter=10_000
 #
 # This heterogeneity is important for realistic migration
 # and attack-amplification dynamics.
-def _lognormal_stakes(total, n, mu=-2.0, sigma=1.0):
-    xs = [random.lognormvariate(mu, sigma) for _ in range(n)]
+def _lognormal_stakes(total, n, mu=-2.0, sigma=1.0, rng=random):
+    xs = [rng.lognormvariate(mu, sigma) for _ in range(n)]
     s = sum(xs)
     return [total * (x / s) for x in xs]
 
@@ -114,6 +115,7 @@ def initialize_world(
         vote_delay_attack_on=False,
         pull_prob: float = 0.0,
         star_gap_multiplier: float = 3.0,
+        rng=None,
 ):
     """
     Creates validators + delegators with normalized total stake = 1.0.
@@ -121,7 +123,11 @@ def initialize_world(
     - each validator self-stake <= max_validator_stake
     - delegators get stake summing to 1 - validator_frac
     - delegators are initially assigned to pool validators (is_pool=True)
+    - rng (a random.Random) drives initialization and is handed to every agent;
+      defaults to the global `random` module
     """
+    draw = rng if rng is not None else random
+
     if not (0.0 < validator_frac < 1.0):
         raise ValueError("validator_frac must be between 0 and 1 (exclusive).")
     if len(pools_voting_powers) > num_validators:
@@ -135,21 +141,23 @@ def initialize_world(
 
     # validator self-bonds (capped)
     v_stakes = _get_shares(validators_total, num_validators, max_validator_stake,
-                           alpha=1.0) if validators_stake_dirichlet_distributed else [validators_total / (num_validators)] * num_validators
+                           alpha=1.0, rng=draw) if validators_stake_dirichlet_distributed else [validators_total / (num_validators)] * num_validators
     validators = []
     for index, p_voting_power in enumerate(pools_voting_powers):
         pool_id = f"Pool_{index}"
         validators.append(
-            Validator(pool_id, p_voting_power, is_pool=True, apr_window=apr_window, commission_rate=pool_commission_rate))
+            Validator(pool_id, p_voting_power, is_pool=True, apr_window=apr_window, commission_rate=pool_commission_rate,
+                      rng=rng))
 
     for i in range(num_validators):
         validators.append(
-            Validator(f"Validator_{i}", v_stakes[i], is_pool=False, apr_window=apr_window, commission_rate=0.0))
+            Validator(f"Validator_{i}", v_stakes[i], is_pool=False, apr_window=apr_window, commission_rate=0.0,
+                      rng=rng))
 
     victims = []
     if victim_pool_stake > 0.0:
         victim = Validator('Victim', victim_pool_stake, is_pool=True, apr_window=apr_window,
-                           commission_rate=pool_commission_rate)
+                           commission_rate=pool_commission_rate, rng=rng)
         validators.append(victim)
         victims.append(victim)
 
@@ -160,11 +168,11 @@ def initialize_world(
         prob_to_control_aggregator = 1 - (1 - aggregators_number / number_of_nodes) ** (
                     byzantine_validator_stake * number_of_nodes) if aggregators_number > 0 else 1.0
         validators.append(Byzantine('Attacker', byzantine_validator_stake, apr_window, victims,
-                                    vote_omission_attack_on, vote_delay_attack_on, prob_to_control_aggregator))
+                                    vote_omission_attack_on, vote_delay_attack_on, prob_to_control_aggregator, rng=rng))
 
     # delegator stakes (heavy-tailed, normalized)
     d_stakes = _lognormal_stakes(delegators_total, num_delegators, mu=delegator_mu,
-                                 sigma=delegator_sigma) if delegators_stake_lognormal_distributed else [delegators_total / (num_delegators)] * num_delegators
+                                 sigma=delegator_sigma, rng=draw) if delegators_stake_lognormal_distributed else [delegators_total / (num_delegators)] * num_delegators
 
     avg_d_stake = (sum(d_stakes) / len(d_stakes)) if len(d_stakes) > 0 else 1.0
 
@@ -178,7 +186,7 @@ def initialize_world(
 
         # personal threshold: large ones tolerate small differences (higher threshold), small ones are more "nervous"
         # + a small noise level (log-normal)
-        noise = random.lognormvariate(mu=0.0, sigma=0.15)  # ~ +/- 15%
+        noise = draw.lognormvariate(mu=0.0, sigma=0.15)  # ~ +/- 15%
         personal_threshold = 0.002 * (1.0 + 0.35 * math.log1p(stake_factor)) * noise # 0.002 - calibrated value. Too high - no migration, to low - chaotic market  
 
         # personal streak: large ones + loyal wait longer
@@ -187,14 +195,14 @@ def initialize_world(
 
         d = Delegator(j, stake, aggressiveness=aggressiveness, loyalty=loyalty, apr_gap_threshold=personal_threshold,
                       streak_required=personal_streak,
-                      pull_prob=pull_prob, star_gap_multiplier=star_gap_multiplier)
+                      pull_prob=pull_prob, star_gap_multiplier=star_gap_multiplier, rng=rng)
         delegators.append(d)
 
     # build world
     world = World(validators, delegators, setup, reward_per_round)
 
     # initial random delegation assignment
-    assign_initial_delegations(world, weighted=pool_selection_weighted)
+    assign_initial_delegations(world, weighted=pool_selection_weighted, rng=draw)
 
     if verbose:
         print_sanity_checks(world, max_validator_stake)
@@ -202,19 +210,20 @@ def initialize_world(
     return world
 
 
-def assign_initial_delegations(world, weighted=True, alpha=0.5):
+def assign_initial_delegations(world, weighted=True, alpha=0.5, rng=random):
     pools = world.pools()
     if not pools:
         raise RuntimeError("No pool validators available for initial delegation.")
 
     if weighted:
         eps = 1e-18
-        weights = [(v.voting_power + eps) ** alpha for v in pools]
+        # the weights are fixed for the whole assignment: accumulate them once, not once per delegator
+        cum_weights = list(itertools.accumulate((v.voting_power + eps) ** alpha for v in pools))
     else:
-        weights = None
+        cum_weights = None
 
     for d in world.delegators:
-        chosen = random.choices(pools, weights=weights, k=1)[0]
+        chosen = rng.choices(pools, cum_weights=cum_weights, k=1)[0]
         d.bounded_validator = chosen
         chosen.add_delegator(d)
 
@@ -0,0 +1,96 @@
+import numpy as np
+
+from engine.arrays import ValidatorArrays
+from setups.proposer_selector import WeightedProposerSelector
+from setups.vote_policy import ProbabilisticYesVotes
+
+
+class MacroStepper:
+    """
+    Simulates K rounds at a time while the voting power cannot change (no pending migrations
+    and no delegator able to move: the "paper" configuration, or the warm-up of any run).
+
+    The rounds are then independent and identically distributed, so instead of K committees
+    it draws, for all K rounds at once,
+      - the proposers, proportional to voting power (WeightedProposerSelector),
+      - a (K, V) mask of included voters: online and YES (ProbabilisticYesVotes), minus the
+        Byzantine validators' refusals of victim leaders (vote delay) and the victims their
+        proposals omit (vote omission), plus the proposer itself,
+    and applies the rounds' effects together: rewards through RewardPolicy.distribute_many,
+    uptime and APR through the closed-form EMA updates of ValidatorArrays (loaded from the
+    validators at the start of the step and stored back at its end), leader / attack counts,
+    window counters of Metrics and block counts of the ChainRetention.
+
+    Every round has exactly the distribution of Protocol.step, but the random numbers come
+    from a NumPy generator (seeded from the vote policy's rng), so the sample path differs.
+    No blocks or committees are produced.
+    """
+
+    def __init__(self, world, rounds_per_year):
+        setup = world.setup
+        if not setup.committee_selector.selects_all:
+            raise ValueError("macro steps need a committee of all validators")
+        if not isinstance(setup.proposer_selector, WeightedProposerSelector):
+            raise ValueError("macro steps need a WeightedProposerSelector")
+        if not isinstance(setup.vote_policy, ProbabilisticYesVotes):
+            raise ValueError("macro steps need ProbabilisticYesVotes")
+        self.world = world
+        self.rounds_per_year = rounds_per_year
+        self.index = {v: i for i, v in enumerate(world.validators)}
+        self.byzantine = [(self.index[v], v) for v in world.attackers()]
+        self.generator = np.random.default_rng(setup.vote_policy.rng.getrandbits(64))
+
+    def static_delegations(self):
+        """True if no delegator can ever move (loyalty 1, no pull), so every round can be a macro step."""
+        return all(d.bounded_validator is not None and d.loyalty >= 1.0 and d.pull_prob <= 0.0
+                   for d in self.world.delegators)
+
+    def run(self, first_round, k, metrics, chain_retention):
+        """Rounds first_round .. first_round+k-1."""
+        world = self.world
+        arrays = ValidatorArrays(world.validators)
+        vote_policy = world.setup.vote_policy
+        generator = self.generator
+        rows = np.arange(k)
+
+        voting_power = arrays.voting_power
+        total_power = world.total_voting_power()
+        cumulative = np.cumsum(voting_power)
+        proposers = np.minimum(np.searchsorted(cumulative, generator.random(k) * cumulative[-1], side="right"),
+                               len(voting_power) - 1)
+        included = generator.random((k, len(voting_power))) <= min(vote_policy.online_p, vote_policy.vote_p)
+        for i, v in self.byzantine:
+            proposed = proposers == i
+            v.leader_count += int(np.count_nonzero(proposed))
+            victims = [self.index[victim] for victim in v.victims]
+            if v.vote_delay_attack_on:
+                refused = np.isin(proposers, victims) & ~proposed
+                included[refused, i] = False
+                v.attack_count += int(np.count_nonzero(refused))
+            if v.vote_omission_attack_on:
+                own = np.flatnonzero(proposed)
+                omitting = own[generator.random(len(own)) <= v.prob_to_control_aggregator]
+                included[np.ix_(omitting, victims)] = False
+                v.attack_count += len(omitting)
+        included[rows, proposers] = True # leader is always included
+
+        included_power = included @ voting_power
+        confirmed = included_power / total_power > 2 / 3
+        for v in world.validators:
+            v.count += k
+        arrays.update_uptime_many(included)
+
+        confirmed_count = int(np.count_nonzero(confirmed))
+        if confirmed_count:
+            rewards = world.setup.reward_policy.distribute_many(
+                voting_power, included[confirmed], proposers[confirmed], world.reward,
+                included_power=included_power[confirmed])
+            arrays.credit(rewards.sum(axis=0))
+            arrays.update_apr_many(rewards, self.rounds_per_year)
+        arrays.store()
+        for _ in range(k - confirmed_count):
+            print("Invalid")
+
+        metrics.on_rounds(k, confirmed_count, world.reward)
+        if chain_retention is not None:
+            chain_retention.on_rounds(world, first_round, proposers, included_power, confirmed)
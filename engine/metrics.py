@@ -1,10 +1,19 @@
 from collections import defaultdict
 
+from engine.profiling import format_phases
+from engine.series import PoolSeries
+from engine.sinks import MemorySink
+
 class Metrics:
-    def __init__(self, print_frequency=1000, keep_history=True):
+    def __init__(self, print_frequency=1000, keep_history=True, sink=None, profiler=None):
         self.print_frequency = print_frequency
         self.keep_history = keep_history
-        self.history = []  # list of dict snapshots
+        # where snapshots go: MemorySink (default) or a file sink from engine/sinks.py
+        self.sink = sink if sink is not None else MemorySink()
+        # iterable of dict snapshots: a list for MemorySink, otherwise the sink itself (read back lazily)
+        self.history = self.sink.snapshots if isinstance(self.sink, MemorySink) else self.sink
+        # optional PhaseProfiler (engine/profiling.py): its per-window phase times go into every snapshot
+        self.profiler = profiler
 
         # window counters
         self.window_rounds = 0
@@ -28,6 +37,13 @@ class Metrics:
     def on_rewards_distributed(self, amount):
         self.window_rewards_distributed += amount
 
+    def on_rounds(self, rounds, confirmed, reward_amount):
+        """Window counters of `rounds` rounds simulated at once (engine/macro.py), `confirmed` of them confirmed."""
+        self.window_rounds += rounds
+        self.window_attempted_blocks += rounds
+        self.window_confirmed_blocks += confirmed
+        self.window_rewards_distributed += reward_amount * confirmed
+
     def on_migrations_executed(self, executed_pairs):
         self.window_migrations_executed += len(executed_pairs)
         for old, new in executed_pairs:
@@ -37,14 +53,13 @@ class Metrics:
                 self.window_gained[new.id] += 1
 
     def snapshot(self, world, round_index):
-        validators = world.validators
-        total_vp = sum(v.voting_power for v in validators)
+        total_vp = world.total_voting_power()
         all_top_vp = self._top_voting_power(world.validators, total_vp, k=10)
 
         def top_k(d, k):
             return sorted(d.items(), key=lambda x: x[1], reverse=True)[:k]
 
-        pending = len(world.pending_migrations)
+        pending = world.pending_migration_count()
 
         # window rates
         if self.window_attempted_blocks > 0:
@@ -79,15 +94,27 @@ class Metrics:
             "reward_delta_by_id" : reward_delta_by_id,
             "pool_stats": pool_stats
         }
+        if self.profiler is not None:
+            # rounds since the previous snapshot; that snapshot's own "metrics" time is counted in this window
+            snap["phases"] = self.profiler.end_window(round_index)
 
         if self.keep_history:
-            self.history.append(snap)
+            self.sink.write(snap)
 
         return snap
 
+    def pool_series(self):
+        """pool_stats of the snapshots kept so far as a PoolSeries ((snapshots x pools) arrays), built on demand."""
+        return PoolSeries.from_history(self.history)
+
+    def close(self):
+        """Write out the snapshots still buffered by the sink."""
+        self.sink.flush()
+
     def report_if_needed(self, world, round_index, print_output):
+        """Take (and optionally print) the snapshot of a snapshot round; returns it, or None on other rounds."""
         if round_index % self.print_frequency != 0:
-            return
+            return None
         pool_ids = {v.id for v in world.pools()}
         snap = self.snapshot(world, round_index)
 
@@ -121,6 +148,9 @@ class Metrics:
                   ", ".join([f"{pid}:{st['reward_delta']:.6f}" for pid, st in pools_top10_rewards]))
             print("Top10 delegators (pools):", ", ".join([f"{pid}:{st['delegators']}" for pid, st in pools_top10_delegators]))
             print("Top10 net flow (pools):", ", ".join([f"{pid}:{st['net_flow']}" for pid, st in pools_top10_net_flow]))
+            if "phases" in snap:
+                print("Phase times (last window):")
+                print(format_phases(snap["phases"]))
 
             print("===============")
 
@@ -132,6 +162,7 @@ class Metrics:
         self.window_migrations_executed = 0
         self.window_gained.clear()
         self.window_lost.clear()
+        return snap
 
     def _build_pool_stats(self, world, reward_delta_by_id):
         pool_stats = {}
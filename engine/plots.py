@@ -1,13 +1,29 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import os
 
+from engine.series import PoolSeries
+
 def _get_series(history, pool_ids, key):
     """
-    history: list of snapshots (dicts)
+    history: iterable of snapshots (dicts): Metrics.history, or a sink from engine/sinks.py,
+             which is read back from its file lazily; or a PoolSeries (no per-snapshot loop)
     pool_ids: list[int]
     key: one of "apr", "voting_power", "delegators", "reward_delta", "net_flow"
     Returns: rounds(list), data(dict pool_id -> list)
+             (views of the PoolSeries arrays instead of lists when history is a PoolSeries)
     """
+    if isinstance(history, PoolSeries):
+        rounds = history.rounds()
+        start = 1 if len(rounds) and rounds[0] == 0 else 0 # skip round 0 for the visualization
+        data = {}
+        for pid in pool_ids:
+            if pid in history.pool_ids:
+                data[pid] = history.pool(key, pid)[start:]
+            else:
+                data[pid] = np.zeros(len(rounds) - start)
+        return rounds[start:], data
+
     rounds = []
     data = {pid: [] for pid in pool_ids}
 
@@ -30,12 +46,14 @@ def store_pool_stats_plot(history, pool_ids, key, title, ylabel, folder, filenam
     rounds, data = _get_series(history, pool_ids, key)
 
     plt.figure()
-    all_vals = []
+    lows, highs = [], []
 
     for pid in pool_ids:
         series = data[pid]
         plt.plot(rounds, series, label=str(pid))
-        all_vals.extend(series)
+        if len(series):
+            lows.append(np.min(series))
+            highs.append(np.max(series))
 
     plt.xlabel("round")
     plt.ylabel(ylabel)
@@ -46,9 +64,9 @@ def store_pool_stats_plot(history, pool_ids, key, title, ylabel, folder, filenam
     ax.ticklabel_format(style='plain', useOffset=False, axis='y')
 
     # auto-zoom
-    if all_vals:
-        y_min = min(all_vals)
-        y_max = max(all_vals)
+    if lows:
+        y_min = min(lows)
+        y_max = max(highs)
         pad = 0.05 * (y_max - y_min + 1e-12)  # small padding
         plt.ylim(y_min - pad, y_max + pad)
 
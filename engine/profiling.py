@@ -0,0 +1,110 @@
+import cProfile
+import time
+
+# phases of Protocol.step (and macro_step), in execution order
+PROCESS_MIGRATIONS = 0
+UPDATE_DELEGATIONS = 1
+SELECT_COMMITTEE = 2
+VOTE = 3            # Committee.round: proposer, votes, included voters
+UPTIME = 4
+DISTRIBUTE_REWARDS = 5
+UPDATE_APR = 6
+METRICS = 7         # Metrics.report_if_needed (snapshot rounds)
+MACRO_STEP = 8      # MacroStepper.run
+PHASES = ("process_migrations", "update_delegations", "select_committee", "vote", "uptime",
+          "distribute_rewards", "update_apr", "metrics", "macro_step")
+
+
+class PhaseProfiler:
+    """
+    Per-phase wall-clock timers and call counters for Protocol.run.
+
+    Protocol calls start() at the beginning of a round and lap(phase) after each phase, so a
+    phase is charged the monotonic time since the previous lap; without a profiler those calls
+    are skipped (one None check per phase). The counters are summed per metrics window:
+    every snapshot gets a "phases" entry {phase: {"seconds", "calls"}} for the rounds since the
+    previous snapshot, and the same dicts are kept in `windows` as (round, phases) pairs.
+
+    profile_window: optionally run cProfile over one window (0 = the window ending at the first
+    snapshot); its stats are written to profile_path, or kept in `profile` (a cProfile.Profile).
+
+    Protocol copies the profiler for every run (as it does the stopping rule), so the object
+    passed to run_simulation / run_sweep stays empty: a run's timings are in its snapshots and
+    in protocol.profiler. Runs sharing a profile_path overwrite each other's stats.
+    """
+
+    def __init__(self, profile_window=None, profile_path=None):
+        self.profile_window = profile_window
+        self.profile_path = profile_path
+        self.profile = None
+        self.windows = []
+        self._seconds = [0.0] * len(PHASES)
+        self._calls = [0] * len(PHASES)
+        self._last = 0.0
+        self._profiling = None
+
+    def bind(self):
+        """Start from no windows (called by Protocol on its copy when a run starts)."""
+        self.profile = None
+        self.windows = []
+        self._seconds = [0.0] * len(PHASES)
+        self._calls = [0] * len(PHASES)
+        self._profiling = None
+        if self.profile_window == 0:
+            self._start_profile()
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self._seconds[phase] += now - self._last
+        self._calls[phase] += 1
+        self._last = now
+
+    def end_window(self, round_index):
+        """Close the window ending at this snapshot round; returns its {phase: {"seconds", "calls"}}."""
+        phases = {name: {"seconds": self._seconds[i], "calls": self._calls[i]}
+                  for i, name in enumerate(PHASES) if self._calls[i]}
+        self.windows.append((round_index, phases))
+        self._seconds = [0.0] * len(PHASES)
+        self._calls = [0] * len(PHASES)
+
+        if self._profiling is not None:
+            self._profiling.disable()
+            self.profile = self._profiling
+            self._profiling = None
+            if self.profile_path is not None:
+                self.profile.dump_stats(self.profile_path)
+        elif self.profile_window == len(self.windows):
+            self._start_profile()
+        return phases
+
+    def totals(self):
+        """{phase: {"seconds", "calls"}} summed over all closed windows."""
+        totals = {}
+        for _, phases in self.windows:
+            for name, entry in phases.items():
+                total = totals.setdefault(name, {"seconds": 0.0, "calls": 0})
+                total["seconds"] += entry["seconds"]
+                total["calls"] += entry["calls"]
+        return totals
+
+    def _start_profile(self):
+        self._profiling = cProfile.Profile()
+        self._profiling.enable()
+
+    def __getstate__(self):
+        # a running cProfile.Profile cannot be copied or pickled (fork, checkpoints, process pools)
+        state = dict(self.__dict__)
+        state["_profiling"] = None
+        state["profile"] = None
+        return state
+
+
+def format_phases(phases):
+    """One line per phase, slowest first: seconds, share of the window and calls."""
+    total = sum(entry["seconds"] for entry in phases.values()) or 1.0
+    ranked = sorted(phases.items(), key=lambda item: item[1]["seconds"], reverse=True)
+    return "\n".join(f"{name:>20}: {entry['seconds']:9.4f} s {entry['seconds'] / total:6.1%} {entry['calls']:>8} calls"
+                     for name, entry in ranked)
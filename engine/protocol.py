@@ -1,20 +1,67 @@
-from model.committee import Committee
+import copy
+
 from engine.metrics import Metrics
+from engine.round import RoundContext
+from engine.delegation import DelegatorArrays, DelegatorEvents
+from engine.chain import CountRetention
+from engine.macro import MacroStepper
+from engine.profiling import (PROCESS_MIGRATIONS, UPDATE_DELEGATIONS, SELECT_COMMITTEE, VOTE, UPTIME,
+                              DISTRIBUTE_REWARDS, UPDATE_APR, METRICS, MACRO_STEP)
 
 class Protocol:
-    def __init__(self, committee_size, world, rounds, migration_delay_rounds, rounds_per_year, update_delegation_warm_up_rounds, verbose):
+    def __init__(self, committee_size, world, rounds, migration_delay_rounds, rounds_per_year, update_delegation_warm_up_rounds, verbose,
+                 streams=None, checkpointer=None, metrics_sink=None, chain_retention=None,
+                 delegation_events=False, macro_step_rounds=None, stopping_rule=None, profiler=None):
         self.committee_size = committee_size
         self.world = world
         self.rounds = rounds
         self.migration_delay_rounds = migration_delay_rounds
-        self.metrics = Metrics(print_frequency=1000)
+        # optional PhaseProfiler (engine/profiling.py): per-phase timers, summed per metrics window;
+        # copied like the stopping rule, so one profiler object can be passed to many runs
+        self.profiler = None
+        if profiler is not None:
+            self.profiler = copy.copy(profiler)
+            self.profiler.bind()
+        self.metrics = Metrics(print_frequency=1000, sink=metrics_sink, profiler=self.profiler)
         self.rounds_per_year = rounds_per_year
         self.update_delegation_warm_up_rounds = update_delegation_warm_up_rounds
         self.verbose = verbose
+        # optional RandomStreams (common-random-numbers mode): reseeded at the start of every round
+        self.streams = streams
+        self.next_round = 0 # first round not executed yet (run_until / fork continue from here)
+        # optional Checkpointer: periodically saves the protocol so a crashed run can be resumed
+        self.checkpointer = checkpointer
+        # optional ChainRetention (engine/chain.py): bounds what is kept of the produced blocks
+        if macro_step_rounds and chain_retention is None:
+            chain_retention = CountRetention() # macro steps produce no blocks to keep
+        self.chain_retention = chain_retention
+        if chain_retention is not None:
+            chain_retention.bind(world)
+        # per-round buffers (committee, signed flags) reused instead of reallocated every round
+        self.round_context = RoundContext(world, committee_size,
+                                          reuse_committee=chain_retention is not None and not chain_retention.keeps_blocks)
+        # optional event-driven delegator decisions: only delegators whose state can change are looked at
+        self.delegator_events = DelegatorEvents(world) if delegation_events else None
+        # delegator decisions as vector operations (None: one choose_validator_by_apr call per delegator)
+        self.delegator_arrays = None if delegation_events else DelegatorArrays.build(world)
+        # optional macro steps: up to macro_step_rounds rounds drawn at once while voting power cannot change
+        self.macro_step_rounds = macro_step_rounds
+        self.macro = None
+        self.static_delegations = False
+        if macro_step_rounds:
+            if streams is not None:
+                raise ValueError("macro steps do not draw from RandomStreams")
+            self.macro = MacroStepper(world, rounds_per_year)
+            self.static_delegations = self.macro.static_delegations()
+        # optional stopping rule (engine/convergence.py), copied so a rule object can be shared by many runs
+        self.stopping_rule = None
+        if stopping_rule is not None:
+            self.stopping_rule = copy.copy(stopping_rule)
+            self.stopping_rule.bind()
 
     def select_committee(self):
-        committee = Committee(self.committee_size, self.world.setup)
-        self.world.setup.select_committee(committee, self.world.validators)
+        committee = self.round_context.new_committee(self.world.setup)
+        self.world.setup.select_committee(committee, self.world.validators, self.round_context)
         return committee
 
     def calculate_rewards(self, committee):
@@ -23,10 +70,25 @@ class Protocol:
             reward_amount=self.world.reward)
 
     def update_delegations(self):
+        if self.delegator_events is not None:
+            execute_round = self.world.round_index + self.migration_delay_rounds
+            for delegator, old, new in self.delegator_events.decide(self.world.round_index, execute_round):
+                self.world.schedule_migration(delegator, old, new, execute_round)
+            return
+
+        if self.delegator_arrays is not None:
+            execute_round = self.world.round_index + self.migration_delay_rounds
+            switches = self.delegator_arrays.decide(self.world._pending_delegator_set, draw_pending=self.streams is not None)
+            for delegator, old, new in switches:
+                self.world.schedule_migration(delegator, old, new, execute_round)
+            return
+
         pool = self.world.pools()
         for delegator in self.world.delegators:
             # If already waiting to migrate, skip decisions — O(1) set lookup
-            if id(delegator) in self.world._pending_delegator_set:
+            if delegator in self.world._pending_delegator_set:
+                if self.streams is not None:
+                    delegator.rng.random() # keep the decision stream aligned with the paired world
                 continue
 
             old = delegator.bounded_validator
@@ -42,36 +104,138 @@ class Protocol:
     def run(self):
         #committee = self.selectCommittee()
         #self.updateDelegations(committee)
-        for i in range(self.rounds):
-            self.world.round_index = i
-            self.metrics.on_round_start()
-
-            executed = self.world.process_migrations(i)  # execute scheduled moves
-            self.metrics.on_migrations_executed(executed)
+        self.run_until(self.rounds)
+        self.metrics.close()
+
+    def run_until(self, end_round):
+        """Execute rounds next_round .. end_round-1."""
+        while self.next_round < end_round and not self.stopped():
+            i = self.next_round
+            k = self.macro_rounds(i, end_round)
+            if k:
+                self.macro_step(i, k)
+            else:
+                self.step(i)
+            if self.checkpointer is not None:
+                self.checkpointer.after_round(self)
+        self.sync()
+
+    def sync(self):
+        """Write the delegator state held in arrays (streaks) back to the Delegator objects."""
+        if self.delegator_arrays is not None:
+            self.delegator_arrays.sync()
+        if self.delegator_events is not None:
+            self.delegator_events.sync()
+
+    def stopped(self):
+        """True once the stopping rule has ended the run."""
+        return self.world.stop_reason is not None
+
+    def observe(self, snap):
+        """Hand a metrics snapshot (None on rounds without one) to the stopping rule."""
+        if snap is not None and self.stopping_rule is not None and self.stopping_rule.observe(snap):
+            self.world.stop_reason = self.stopping_rule.reason
+
+    def macro_rounds(self, i, end_round):
+        """Number of rounds from round i on that can be one macro step (0: step round i alone)."""
+        if self.macro is None or self.world.pending_migration_count():
+            return 0
+        k = min(self.macro_step_rounds, end_round - i)
+        if not self.static_delegations:
+            k = min(k, self.update_delegation_warm_up_rounds + 1 - i) # delegators decide after the warm-up
+        # a step ends at the next snapshot round, so the snapshot sees the state after it
+        frequency = self.metrics.print_frequency
+        k = min(k, -(-i // frequency) * frequency - i + 1)
+        return max(k, 0)
+
+    def macro_step(self, i, k):
+        """Execute rounds i .. i+k-1 at once (engine/macro.py)."""
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start()
+        self.world.round_index = i + k - 1
+        self.world.process_migrations(i + k - 1) # none pending; moves the calendar along
+        if profiler is not None:
+            profiler.lap(PROCESS_MIGRATIONS)
+        self.macro.run(i, k, self.metrics, self.chain_retention)
+        if profiler is not None:
+            profiler.lap(MACRO_STEP)
+        self.observe(self.metrics.report_if_needed(self.world, i + k - 1, self.verbose))
+        if profiler is not None:
+            profiler.lap(METRICS)
+        self.next_round = i + k
+
+    def fork(self):
+        """
+        Independent copy of the protocol with its world, metrics and random state at next_round.
+        Continuing the copy gives exactly the rounds the original would have executed.
+
+        Blocks already proposed are never modified again, so the copy shares them with the
+        original instead of copying the chain (which would also recurse block -> committee ->
+        validator -> proposed_blocks -> ... once the chain gets long).
+        """
+        memo = {}
+        for v in self.world.validators:
+            for block in v.proposed_blocks:
+                memo[id(block)] = block
+        return copy.deepcopy(self, memo)
+
+    def step(self, i):
+        """Execute round i."""
+        profiler = self.profiler # None: no timing at all
+        if profiler is not None:
+            profiler.start()
+        if self.streams is not None:
+            self.streams.start_round(i)
+        self.world.round_index = i
+        self.metrics.on_round_start()
+
+        executed = self.world.process_migrations(i)  # execute scheduled moves
+        self.metrics.on_migrations_executed(executed)
+        if profiler is not None:
+            profiler.lap(PROCESS_MIGRATIONS)
+
+        if self.world.round_index > self.update_delegation_warm_up_rounds: # need to wait some time
+            self.update_delegations() # schedule new moves (not apply instantly)
+            if profiler is not None:
+                profiler.lap(UPDATE_DELEGATIONS)
+
+        committee = self.select_committee()
+        self.metrics.on_block_attempt()
+        if profiler is not None:
+            profiler.lap(SELECT_COMMITTEE)
+        new_block = committee.round()
+        if profiler is not None:
+            profiler.lap(VOTE)
+
+        # Update uptime score for every validator every round, regardless of
+        # block confirmation. signed=True iff the validator's signature was
+        # included in the proposer's selected_voters set. Under a vote-omission
+        # attack the victim is excluded here even though it voted → score drops.
+        signed = self.round_context.mark_signed(committee.selected_voters)
+        for v, s in zip(self.world.validators, signed):
+            v.update_uptime(s)
+        if profiler is not None:
+            profiler.lap(UPTIME)
+
+        if self.chain_retention is not None:
+            self.chain_retention.on_round(i, committee, new_block)
+
+        if new_block is not None:
+            self.world.blockchain.append(new_block)
+            self.metrics.on_block_confirmed()
+
+            self.calculate_rewards(committee)
+            self.metrics.on_rewards_distributed(self.world.reward)
+            if profiler is not None:
+                profiler.lap(DISTRIBUTE_REWARDS)
 
-            if self.world.round_index > self.update_delegation_warm_up_rounds: # need to wait some time
-                self.update_delegations() # schedule new moves (not apply instantly)
-
-            committee = self.select_committee()
-            self.metrics.on_block_attempt()
-            new_block = committee.round()
-
-            # Update uptime score for every validator every round, regardless of
-            # block confirmation. signed=True iff the validator's signature was
-            # included in the proposer's selected_voters set. Under a vote-omission
-            # attack the victim is excluded here even though it voted → score drops.
-            signed_ids = {id(v) for v in committee.selected_voters}
             for v in self.world.validators:
-                v.update_uptime(id(v) in signed_ids)
-
-            if new_block is not None:
-                self.world.blockchain.append(new_block)
-                self.metrics.on_block_confirmed()
-
-                self.calculate_rewards(committee)
-                self.metrics.on_rewards_distributed(self.world.reward)
-
-                for v in self.world.validators:
-                    v.update_apr(self.rounds_per_year)
-
-            self.metrics.report_if_needed(self.world, i, self.verbose)
\ No newline at end of file
+                v.update_apr(self.rounds_per_year)
+            if profiler is not None:
+                profiler.lap(UPDATE_APR)
+
+        self.observe(self.metrics.report_if_needed(self.world, i, self.verbose))
+        if profiler is not None:
+            profiler.lap(METRICS)
+        self.next_round = i + 1
\ No newline at end of file
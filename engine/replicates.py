@@ -0,0 +1,53 @@
+import math
+
+import numpy as np
+
+
+def replicate_seeds(seed, replicates):
+    """
+    Seeds of the replicates: seed, seed + 1, ... (replicate 0 is the single run with `seed`).
+    Run them as a run_sweep grid, e.g. run_sweep({"seed": replicate_seeds(SEED, 32)}, **params),
+    and summarize the rows with summarize_replicates(); every replicate is a full run.
+    """
+    return [seed + r for r in range(replicates)]
+
+
+def summarize_replicates(rows, metrics=("effectiveness", "cost", "cost2"), confidence=0.95,
+                         bootstrap_samples=2000, seed=0):
+    """
+    Mean, standard error and percentile-bootstrap confidence interval of every metric over the rows.
+
+    Rows where a metric is None (cost2 when no pool gained from the attack) are left out of
+    that metric; "n" counts the rows used. All bootstrap resamples of a metric are drawn as one
+    (bootstrap_samples x n) index array. Returns {metric: {"n", "mean", "se", "ci_low", "ci_high"}}
+    (se and the interval are nan below two values).
+    """
+    generator = np.random.default_rng(seed)
+    summary = {}
+    for name in metrics:
+        values = np.array([row[name] for row in rows if row[name] is not None], dtype=float)
+        summary[name] = replicate_stats(values, confidence, bootstrap_samples, generator)
+    return summary
+
+
+def replicate_stats(values, confidence, bootstrap_samples, generator):
+    n = len(values)
+    stats = {"n": n, "mean": float(values.mean()) if n else math.nan,
+             "se": math.nan, "ci_low": math.nan, "ci_high": math.nan}
+    if n < 2:
+        return stats
+    stats["se"] = float(values.std(ddof=1) / math.sqrt(n))
+    means = values[generator.integers(0, n, size=(bootstrap_samples, n))].mean(axis=1)
+    stats["ci_low"], stats["ci_high"] = (float(q) for q in np.quantile(means, [(1 - confidence) / 2,
+                                                                                (1 + confidence) / 2]))
+    return stats
+
+
+def format_summary(summary, confidence=0.95):
+    """Plain-text table: one line per metric with its n, mean, standard error and confidence interval."""
+    level = f"{confidence:.0%} CI"
+    lines = [" | ".join(f"{h:>14}" for h in ("metric", "n", "mean", "se", level + " low", level + " high"))]
+    for name, stats in summary.items():
+        cells = [name, stats["n"], stats["mean"], stats["se"], stats["ci_low"], stats["ci_high"]]
+        lines.append(" | ".join(f"{c:>14.6g}" if isinstance(c, float) else f"{str(c):>14}" for c in cells))
+    return "\n".join(lines)
@@ -0,0 +1,38 @@
+import random
+
+from agents.byzantine import Byzantine
+
+
+class RandomStreams:
+    """
+    One random.Random per purpose, all derived from a single seed (common random numbers).
+
+    Two worlds built from RandomStreams with the same seed draw identical numbers for the
+    same purpose wherever their logic matches, e.g. a baseline and an attack world get the
+    same proposer and vote draws even after the attack changed some delegator's decision.
+    start_round() reseeds every stream from (seed, purpose, round), so a difference in how
+    many numbers one world consumed in a round never carries over into the next round.
+    """
+    PURPOSES = ("init", "committee", "proposer", "votes", "blocks", "byzantine", "delegators", "delegator_choice")
+
+    def __init__(self, seed):
+        self.seed = seed
+        for purpose in self.PURPOSES:
+            setattr(self, purpose, random.Random(f"{seed}:{purpose}"))
+
+    def start_round(self, round_index):
+        for purpose in self.PURPOSES:
+            getattr(self, purpose).seed(f"{self.seed}:{purpose}:{round_index}")
+
+    def bind_setup(self, setup):
+        """Copy of `setup` whose policies draw from their own streams."""
+        return setup.bind_rng(self.init, committee_selector=self.committee, proposer_selector=self.proposer,
+                              vote_policy=self.votes)
+
+    def bind_agents(self, world):
+        """Point every agent of an initialized world at its per-purpose stream."""
+        for v in world.validators:
+            v.rng = self.byzantine if isinstance(v, Byzantine) else self.blocks
+        for d in world.delegators:
+            d.rng = self.delegators
+            d.choice_rng = self.delegator_choice
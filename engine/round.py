@@ -0,0 +1,58 @@
+import numpy as np
+
+from model.block import Block
+from model.committee import Committee
+
+
+class RoundContext:
+    """
+    Buffers a Protocol reuses in every round instead of building them anew.
+
+      committee  one Committee (with one Block, see Committee.new_block), reset in place each
+                 round. Only when the ChainRetention keeps no blocks: a kept block holds on to its
+                 committee, so otherwise every round gets a fresh Committee and Block, as before.
+      signed     one byte per validator (world.validators order): 1 iff its signature is in this
+                 round's committee.selected_voters
+      voter_indices  indices of this round's selected voters, used to clear `signed` in place
+      sampler, index, members  the world's voting power sampler, validator -> position, and the
+                 validators as an object array; handed to a committee of every validator
+                 (Setup.select_committee)
+      byzantine  the world's Byzantine validators, set on every committee (Committee.byzantine) so
+                 vote policies only ask them whether they vote for the leader
+    """
+
+    def __init__(self, world, committee_size, reuse_committee=False):
+        self.committee_size = committee_size
+        self.sampler = world.voting_power_sampler
+        self.index = {v: i for i, v in enumerate(world.validators)}
+        self.members = np.empty(len(world.validators), dtype=object)
+        self.members[:] = world.validators
+        self.signed = bytearray(len(world.validators))
+        self.voter_indices = []
+        self.byzantine = world.attackers()
+        self.committee = None
+        if reuse_committee:
+            self.committee = Committee(committee_size, world.setup)
+            self.committee.byzantine = self.byzantine
+            self.committee.block = Block(None, None, self.committee)
+
+    def new_committee(self, setup):
+        """Empty committee for the next round."""
+        committee = self.committee
+        if committee is None:
+            committee = Committee(self.committee_size, setup)
+            committee.byzantine = self.byzantine
+            return committee
+        committee.votes.clear()
+        committee.proposer = None
+        return committee
+
+    def mark_signed(self, selected_voters):
+        """Set `signed` to the selected voters of this round (and clear the previous round's)."""
+        signed = self.signed
+        for i in self.voter_indices:
+            signed[i] = 0
+        self.voter_indices[:] = [self.index[v] for v in selected_voters]
+        for i in self.voter_indices:
+            signed[i] = 1
+        return signed
@@ -0,0 +1,51 @@
+class WeightedSampler:
+    """
+    Draws items with probability proportional to their weight, like
+    rng.choices(items, weights=weights, k=1)[0], in O(log n) instead of O(n).
+
+    The weights live in the leaves of a sum tree (every node holds the sum of its two
+    children). update() rewrites one leaf and recomputes its ancestors from their children,
+    so the sums are always exactly those of the current weights and never drift with the
+    number of updates, as incremental +delta updates (a Fenwick tree) would.
+    """
+
+    def __init__(self, items, weights):
+        self.items = list(items)
+        self.index = {item: i for i, item in enumerate(self.items)}
+        self.size = 1
+        while self.size < len(self.items):
+            self.size *= 2
+        self.tree = [0.0] * (2 * self.size)
+        self.tree[self.size:self.size + len(self.items)] = [float(w) for w in weights]
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = self.tree[2 * node] + self.tree[2 * node + 1]
+
+    def total(self):
+        return self.tree[1]
+
+    def weight(self, item):
+        return self.tree[self.size + self.index[item]]
+
+    def update(self, item, weight):
+        tree = self.tree
+        node = self.size + self.index[item]
+        tree[node] = float(weight)
+        node //= 2
+        while node:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node //= 2
+
+    def sample(self, rng):
+        """One item drawn with rng.random(), one number per draw like rng.choices()."""
+        tree = self.tree
+        if tree[1] <= 0.0:
+            raise ValueError("Total of weights must be greater than zero")
+        u = rng.random() * tree[1]
+        node = 1
+        while node < self.size:
+            node *= 2
+            if u >= tree[node]:
+                u -= tree[node]
+                node += 1
+        # rounding can step past the last item (into the zero-weight padding)
+        return self.items[min(node - self.size, len(self.items) - 1)]
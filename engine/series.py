@@ -0,0 +1,106 @@
+import numpy as np
+
+from engine.sinks import POOL_FIELDS
+
+
+class PoolSeries:
+    """
+    Pool statistics of a run, one float64 (snapshots x pools) array per POOL_FIELDS entry
+    (apr, delegator_apr, score, voting_power, delegators, reward_delta, gained, lost, net_flow).
+
+    The arrays are preallocated and grow by chunk_size snapshots (or by half their size once
+    they are larger), so appending a snapshot does not allocate. rounds() / series() / pool()
+    return views, no copies. PoolSeries.from_history() builds one from any snapshot history
+    or sink (Metrics.pool_series() from the run's own).
+    """
+
+    def __init__(self, pool_ids=None, chunk_size=256):
+        self.pool_ids = None
+        self.chunk_size = chunk_size
+        self.size = 0
+        self._rounds = np.zeros(0, dtype=np.int64)
+        self._columns = {}
+        if pool_ids is not None:
+            self._set_pools(pool_ids)
+
+    def _set_pools(self, pool_ids):
+        self.pool_ids = list(pool_ids)
+        self._pool_index = {pid: p for p, pid in enumerate(self.pool_ids)}
+        self._columns = {field: np.zeros((len(self._rounds), len(self.pool_ids))) for field in POOL_FIELDS}
+
+    def _reserve(self, count):
+        capacity = len(self._rounds)
+        if self.size + count <= capacity:
+            return
+        capacity = max(self.size + count, capacity + max(self.chunk_size, capacity // 2))
+        rounds = np.zeros(capacity, dtype=np.int64)
+        rounds[:self.size] = self._rounds[:self.size]
+        self._rounds = rounds
+        for field, column in self._columns.items():
+            grown = np.zeros((capacity, len(self.pool_ids)))
+            grown[:self.size] = column[:self.size]
+            self._columns[field] = grown
+
+    def append(self, round_index, pool_stats):
+        """Add one snapshot's pool_stats ({pool_id: {field: value}}); the first one fixes the pools."""
+        if self.pool_ids is None:
+            self._set_pools(pool_stats)
+        self._reserve(1)
+        row = self.size
+        self._rounds[row] = round_index
+        for pid, stats in pool_stats.items():
+            p = self._pool_index.get(pid)
+            if p is None:
+                continue
+            for field in POOL_FIELDS:
+                self._columns[field][row, p] = stats[field]
+        self.size += 1
+
+    def extend(self, rounds, columns):
+        """Add a block of snapshots: rounds (n,) and {field: (n, pools) array} in pool_ids order."""
+        n = len(rounds)
+        self._reserve(n)
+        self._rounds[self.size:self.size + n] = rounds
+        for field in POOL_FIELDS:
+            self._columns[field][self.size:self.size + n] = columns[field]
+        self.size += n
+
+    def rounds(self):
+        return self._rounds[:self.size]
+
+    def series(self, key):
+        """(snapshots, pools) view of one field"""
+        return self._columns[key][:self.size]
+
+    def pool(self, key, pool_id):
+        """(snapshots,) view of one field for one pool"""
+        return self._columns[key][:self.size, self._pool_index[pool_id]]
+
+    @classmethod
+    def from_history(cls, history, chunk_size=256):
+        """Build from a Metrics.history list or a sink (ColumnarSink files are read chunk by chunk)."""
+        if isinstance(history, cls):
+            return history
+        chunks = getattr(history, "chunks", None)
+        if chunks is not None:
+            series = cls(chunk_size=chunk_size)
+            for scalars, pools, pool_ids in chunks():
+                if series.pool_ids is None:
+                    series._set_pools(pool_ids)
+                series.extend(scalars[0].astype(np.int64), dict(zip(POOL_FIELDS, pools)))
+            return series
+        series = cls(chunk_size=chunk_size)
+        for snap in history:
+            series.append(snap["round"], snap["pool_stats"])
+        return series
+
+    def to_npz(self, path):
+        np.savez(path, rounds=self.rounds(), pool_ids=np.array(self.pool_ids or [], dtype=str),
+                 **{field: self.series(field) for field in self._columns})
+
+    @classmethod
+    def from_npz(cls, path):
+        with np.load(path) as data:
+            series = cls(data["pool_ids"].tolist())
+            series.extend(data["rounds"], {field: data[field] for field in POOL_FIELDS})
+        return series
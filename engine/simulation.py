@@ -0,0 +1,195 @@
+import random
+
+from engine.analysis import summarize_world
+from engine.initializer import initialize_world
+from engine.protocol import Protocol
+from engine.rng import RandomStreams
+
+SEED = 42
+
+
+def build_protocol(com_size, number_of_rounds, reward_per_round,
+                   migration_rounds_delay, rounds_per_year_count,
+                   vote_omission_attack_on, vote_delay_attack_on,
+                   apr_window_length, sim_setup,
+                   victim_stake, attacker_stake, pool_weights,
+                   loyalty, pool_selection_weighted,
+                   validators_stake_dirichlet_distributed, delegators_stake_lognormal_distributed,
+                   aggregators_number, pull_prob, star_gap_multiplier, rng=None, streams=None,
+                   checkpointer=None, metrics_sink=None, chain_retention=None, delegation_events=False,
+                   macro_step_rounds=None, stopping_rule=None, profiler=None):
+    """
+    Initialize a world and the Protocol that runs it.
+    Every draw comes from `rng` (a random.Random), or from the per-purpose `streams`
+    (RandomStreams) in common-random-numbers mode.
+    """
+    if streams is not None:
+        rng = streams.init
+        sim_setup = streams.bind_setup(sim_setup)
+    else:
+        sim_setup = sim_setup.bind_rng(rng)
+    world = initialize_world(
+        num_validators=100-len(pool_weights)-2, #100 - pools - victim - attacker
+        pools_voting_powers=pool_weights,
+        num_delegators=1000,
+        setup=sim_setup,
+        reward_per_round=reward_per_round,
+        validator_frac=0.8,
+        max_validator_stake=0.33,
+        aggressiveness=0.1,
+        loyalty=loyalty,
+        pool_selection_weighted=pool_selection_weighted,
+        validators_stake_dirichlet_distributed=validators_stake_dirichlet_distributed,
+        delegators_stake_lognormal_distributed=delegators_stake_lognormal_distributed,
+        aggregators_number=aggregators_number,
+        verbose=False,
+        apr_window=apr_window_length,
+        pool_commission_rate=sim_setup.pool_commission_rate,
+        byzantine_validator_stake=attacker_stake,
+        victim_pool_stake=victim_stake,
+        vote_omission_attack_on=vote_omission_attack_on,
+        vote_delay_attack_on=vote_delay_attack_on,
+        pull_prob=pull_prob,
+        star_gap_multiplier=star_gap_multiplier,
+        rng=rng,
+    )
+    if streams is not None:
+        streams.bind_agents(world)
+    return Protocol(com_size, world, number_of_rounds, migration_rounds_delay, rounds_per_year_count,
+                    update_delegation_warm_up_rounds=apr_window_length * 3, verbose=False,
+                    streams=streams, checkpointer=checkpointer, metrics_sink=metrics_sink,
+                    chain_retention=chain_retention, delegation_events=delegation_events,
+                    macro_step_rounds=macro_step_rounds, stopping_rule=stopping_rule, profiler=profiler)
+
+
+def run_simulation(com_size, number_of_rounds, reward_per_round,
+                   migration_rounds_delay, rounds_per_year_count,
+                   vote_omission_attack_on, vote_delay_attack_on,
+                   apr_window_length, sim_setup,
+                   victim_stake, attacker_stake, pool_weights,
+                   loyalty, pool_selection_weighted,
+                   validators_stake_dirichlet_distributed, delegators_stake_lognormal_distributed,
+                   aggregators_number, pull_prob, star_gap_multiplier, seed=SEED, cache=None,
+                   checkpointer=None, metrics_sink=None, chain_retention=None, delegation_events=False,
+                   macro_step_rounds=None, stopping_rule=None, profiler=None):
+    """
+    Run one simulation; returns (Metrics.history, World).
+
+    cache: optional RunCache. A baseline run (both attack flags off) is then looked up by the
+    hash of its full configuration and, on a hit, returned as (history, WorldSummary)
+    without simulating; on a miss its history and WorldSummary are stored.
+    checkpointer: optional engine.checkpoint.Checkpointer; the run can then be continued
+    after a crash with engine.checkpoint.resume(checkpointer.path).
+    metrics_sink: optional sink from engine/sinks.py (e.g. ColumnarSink("out/run.col")) that the
+    snapshots are streamed to; the returned history is then that sink, read back lazily.
+    chain_retention: optional policy from engine/chain.py (e.g. CountRetention()) limiting what
+    is kept of the produced blocks, so memory stays flat in long runs.
+    delegation_events: decide delegator moves event-driven (engine/delegation.py:DelegatorEvents);
+    same per-round probabilities, but not the same random numbers as the default.
+    macro_step_rounds: simulate up to this many rounds at once while no delegator can move
+    (engine/macro.py:MacroStepper), e.g. 1000 for the static-delegation (loyalty=1, pull_prob=0)
+    paper runs; same per-round distribution, different random numbers.
+    stopping_rule: optional engine.convergence.ConvergenceStop; the run then ends at the snapshot
+    where the pools have settled (world.stop_reason / world.round_index record why and when).
+    Baseline and attack stopped at different rounds cannot be compared: use run_paired_simulation.
+    profiler: optional engine.profiling.PhaseProfiler, copied for the run; every snapshot then
+    carries the window's per-phase times ("phases"). Results do not depend on it.
+    """
+    key = None
+    if cache is not None and not vote_omission_attack_on and not vote_delay_attack_on:
+        # chain_retention / profiler do not change results, so they are not part of the key
+        key = cache.key({
+            "com_size": com_size, "number_of_rounds": number_of_rounds, "reward_per_round": reward_per_round,
+            "migration_rounds_delay": migration_rounds_delay, "rounds_per_year_count": rounds_per_year_count,
+            "apr_window_length": apr_window_length, "sim_setup": sim_setup,
+            "victim_stake": victim_stake, "attacker_stake": attacker_stake, "pool_weights": pool_weights,
+            "loyalty": loyalty, "pool_selection_weighted": pool_selection_weighted,
+            "validators_stake_dirichlet_distributed": validators_stake_dirichlet_distributed,
+            "delegators_stake_lognormal_distributed": delegators_stake_lognormal_distributed,
+            "aggregators_number": aggregators_number, "pull_prob": pull_prob,
+            "star_gap_multiplier": star_gap_multiplier, "seed": seed, "delegation_events": delegation_events,
+            "macro_step_rounds": macro_step_rounds, "stopping_rule": stopping_rule,
+        })
+        cached = cache.load(key)
+        if cached is not None:
+            summary, history = cached
+            return history, summary
+
+    # Every run owns its random stream (no global random.seed), so baseline & attack runs are
+    # reproducible and independent of each other and of how many runs share a process.
+    protocol = build_protocol(com_size, number_of_rounds, reward_per_round,
+                              migration_rounds_delay, rounds_per_year_count,
+                              vote_omission_attack_on, vote_delay_attack_on,
+                              apr_window_length, sim_setup,
+                              victim_stake, attacker_stake, pool_weights,
+                              loyalty, pool_selection_weighted,
+                              validators_stake_dirichlet_distributed, delegators_stake_lognormal_distributed,
+                              aggregators_number, pull_prob, star_gap_multiplier,
+                              rng=random.Random(seed), checkpointer=checkpointer, metrics_sink=metrics_sink,
+                              chain_retention=chain_retention, delegation_events=delegation_events,
+                              macro_step_rounds=macro_step_rounds, stopping_rule=stopping_rule,
+                              profiler=profiler)
+    protocol.run()
+    if key is not None:
+        cache.store(key, summarize_world(protocol.world), list(protocol.metrics.history))
+    return protocol.metrics.history, protocol.world
+
+
+def run_paired_simulation(seed=SEED, **params):
+    """
+    Common-random-numbers mode: step a baseline and an attack world in the same loop.
+
+    params are run_simulation's parameters; the attack flags apply to the attack world only.
+    Both worlds draw from their own RandomStreams with the same seed, reseeded every round,
+    so proposer choice, votes, Byzantine draws and delegator decisions use identical random
+    numbers wherever the two worlds' logic matches. The difference between the two runs is
+    then driven by the attack rather than by Monte Carlo noise.
+    With a stopping_rule both worlds run until both have stopped, so their lengths match.
+    There is no RunCache here (the baseline draws from RandomStreams, so a run_simulation
+    baseline is not the same run); passing a cache raises ValueError.
+    Returns baseline_history, baseline_world, attack_history, attack_world.
+    """
+    if params.pop("cache", None) is not None:
+        raise ValueError("run_paired_simulation does not use a RunCache")
+    baseline_params = dict(params, vote_omission_attack_on=False, vote_delay_attack_on=False)
+    baseline = build_protocol(**baseline_params, streams=RandomStreams(seed))
+    attack = build_protocol(**params, streams=RandomStreams(seed))
+    for i in range(baseline.rounds):
+        if baseline.stopped() and attack.stopped():
+            break
+        baseline.step(i)
+        attack.step(i)
+    baseline.sync()
+    attack.sync()
+    baseline.metrics.close()
+    attack.metrics.close()
+    return baseline.metrics.history, baseline.world, attack.metrics.history, attack.world
+
+
+def run_forked_simulations(attack_start_round, variants, seed=SEED, **params):
+    """
+    Simulate the shared prefix once and fork every variant from it at attack_start_round.
+
+    params are run_simulation's parameters (the attack flags are ignored: the prefix runs
+    without attack). variants maps a name to the attack switched on at the fork:
+        {"baseline": {"vote_omission_attack_on": False, "vote_delay_attack_on": False},
+         "omission": {"vote_omission_attack_on": True, "vote_delay_attack_on": False},
+         "omission_pool_0": {"vote_omission_attack_on": True, "vote_delay_attack_on": False,
+                             "victim_ids": ["Pool_0"]}}
+    The warm-up and any pre-attack period are computed once instead of once per variant,
+    and attacks can start mid-run. There is no RunCache here; passing a cache raises ValueError.
+    Returns {name: (history, world)}.
+    """
+    if params.pop("cache", None) is not None:
+        raise ValueError("run_forked_simulations does not use a RunCache")
+    params = dict(params, vote_omission_attack_on=False, vote_delay_attack_on=False)
+    prefix = build_protocol(**params, rng=random.Random(seed))
+    prefix.run_until(attack_start_round)
+
+    results = {}
+    for name, attack in variants.items():
+        protocol = prefix.fork()
+        protocol.world.configure_attack(**attack)
+        protocol.run()
+        results[name] = (protocol.metrics.history, protocol.world)
+    return results
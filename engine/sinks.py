@@ -0,0 +1,237 @@
+import csv
+import json
+import os
+import struct
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# snapshot fields kept by the flat formats (CSV, columnar): the per-window scalars and the pool table
+ROUND_FIELDS = ("round", "total_voting_power", "pending_migrations", "window_confirm_rate", "window_rewards",
+                "window_migrations_executed", "migration_rate")
+POOL_FIELDS = ("apr", "delegator_apr", "score", "voting_power", "delegators", "reward_delta", "gained", "lost",
+               "net_flow")
+_INT_FIELDS = {"round", "pending_migrations", "window_migrations_executed", "delegators", "gained", "lost", "net_flow"}
+
+
+def _typed(field, value):
+    return int(value) if field in _INT_FIELDS else float(value)
+
+
+class MemorySink:
+    """Keeps every snapshot in a list (Metrics.history), as before."""
+
+    def __init__(self):
+        self.snapshots = []
+
+    def write(self, snap):
+        self.snapshots.append(snap)
+
+    def flush(self):
+        pass
+
+    def __iter__(self):
+        return iter(self.snapshots)
+
+
+class FileSink(ABC):
+    """
+    Base class of the append-only file sinks.
+
+    At most buffer_size snapshots are held in memory; flush() appends them to `path`.
+    Iterating a sink flushes it and reads the snapshots back from the file one at a time, so a
+    sink can be passed to the plots in place of Metrics.history without loading it whole.
+
+    The file is opened for every flush only, so a sink pickles with its Protocol (checkpoints,
+    process pools). Every flush first truncates the file to what this sink has written, so
+    snapshots a crashed run appended after its last checkpoint are dropped when it is resumed.
+    """
+
+    def __init__(self, path, buffer_size=16):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._size = 0 # bytes of `path` written by this sink
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "wb"):
+            pass
+
+    @classmethod
+    def open(cls, path, buffer_size=16):
+        """Sink over the existing file of an earlier run (e.g. to plot it); writes append to it."""
+        sink = cls.__new__(cls)
+        sink.path = path
+        sink.buffer_size = buffer_size
+        sink._buffer = []
+        sink._size = os.path.getsize(path)
+        return sink
+
+    def write(self, snap):
+        self._buffer.append(snap)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        data = self._encode(self._buffer)
+        self._buffer = []
+        with open(self.path, "r+b") as f:
+            f.truncate(self._size)
+            f.seek(self._size)
+            f.write(data)
+        self._size += len(data)
+
+    def __iter__(self):
+        self.flush()
+        return self._read()
+
+    @abstractmethod
+    def _encode(self, snapshots):
+        """bytes appended to the file for `snapshots`"""
+        pass
+
+    @abstractmethod
+    def _read(self):
+        """generator over the snapshots stored in the file"""
+        pass
+
+
+class JsonlSink(FileSink):
+    """
+    One JSON object per line with the complete snapshot.
+    Read back, tuples (all_top_vp, top_gainers, top_losers) come back as lists.
+    """
+
+    def _encode(self, snapshots):
+        return "".join(json.dumps(snap) + "\n" for snap in snapshots).encode()
+
+    def _read(self):
+        with open(self.path, "rb") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+class CsvSink(FileSink):
+    """
+    One row per pool per snapshot: ROUND_FIELDS, pool_id, POOL_FIELDS.
+    Keeps the window scalars and pool_stats (what the plots use); the per-validator
+    reward deltas and top-k lists are dropped.
+    """
+    COLUMNS = ROUND_FIELDS + ("pool_id",) + POOL_FIELDS
+
+    def __init__(self, path, buffer_size=16):
+        super().__init__(path, buffer_size)
+        self._buffer.append(None) # header row, written by the first flush
+
+    def _encode(self, snapshots):
+        lines = _Lines()
+        writer = csv.writer(lines)
+        for snap in snapshots:
+            if snap is None:
+                writer.writerow(self.COLUMNS)
+                continue
+            scalars = [snap[field] for field in ROUND_FIELDS]
+            for pool_id, stats in snap["pool_stats"].items():
+                writer.writerow(scalars + [pool_id] + [stats[field] for field in POOL_FIELDS])
+        return "".join(lines).encode()
+
+    def _read(self):
+        with open(self.path, newline="") as f:
+            snap = None
+            for row in csv.DictReader(f):
+                round_index = int(row["round"])
+                if snap is None or snap["round"] != round_index:
+                    if snap is not None:
+                        yield snap
+                    snap = {field: _typed(field, row[field]) for field in ROUND_FIELDS}
+                    snap["pool_stats"] = {}
+                snap["pool_stats"][row["pool_id"]] = {field: _typed(field, row[field]) for field in POOL_FIELDS}
+            if snap is not None:
+                yield snap
+
+
+class _Lines(list):
+    """csv.writer target collecting the formatted rows"""
+    write = list.append
+
+
+class ColumnarSink(FileSink):
+    """
+    Compact binary file of float64 columns, written in chunks of buffer_size snapshots:
+        header: magic, JSON {"round_fields", "pool_fields", "pool_ids"}
+        chunk:  int64 n, ROUND_FIELDS as a (fields, n) array, POOL_FIELDS as a (fields, n, pools) array
+    Keeps the same fields as CsvSink. The pool set is fixed by the first snapshot.
+    """
+    MAGIC = b"DPOSCOL1"
+
+    def __init__(self, path, buffer_size=64):
+        super().__init__(path, buffer_size)
+        self.pool_ids = None
+
+    def _encode(self, snapshots):
+        if not snapshots:
+            return b""
+        data = b""
+        if self.pool_ids is None:
+            self.pool_ids = list(snapshots[0]["pool_stats"])
+            header = json.dumps({"round_fields": ROUND_FIELDS, "pool_fields": POOL_FIELDS,
+                                 "pool_ids": self.pool_ids}).encode()
+            data += self.MAGIC + struct.pack("<I", len(header)) + header
+        n = len(snapshots)
+        scalars = np.array([[snap[field] for snap in snapshots] for field in ROUND_FIELDS], dtype="<f8")
+        pools = np.zeros((len(POOL_FIELDS), n, len(self.pool_ids)), dtype="<f8")
+        for j, snap in enumerate(snapshots):
+            stats = snap["pool_stats"]
+            for p, pool_id in enumerate(self.pool_ids):
+                if pool_id in stats:
+                    pools[:, j, p] = [stats[pool_id][field] for field in POOL_FIELDS]
+        return data + struct.pack("<q", n) + scalars.tobytes() + pools.tobytes()
+
+    @classmethod
+    def open(cls, path, buffer_size=64):
+        sink = super().open(path, buffer_size)
+        with open(path, "rb") as f:
+            sink.pool_ids = sink._read_header(f)
+        return sink
+
+    def _read_header(self, f):
+        """pool ids from the header at the start of `f` (None for an empty file)"""
+        magic = f.read(len(self.MAGIC))
+        if not magic:
+            return None
+        if magic != self.MAGIC:
+            raise ValueError(f"{self.path} is not a ColumnarSink file")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length))
+        if tuple(header["round_fields"]) != ROUND_FIELDS or tuple(header["pool_fields"]) != POOL_FIELDS:
+            raise ValueError(f"{self.path} was written with different snapshot fields")
+        return header["pool_ids"]
+
+    def chunks(self):
+        """Yield (round_columns, pool_columns, pool_ids) per chunk: arrays of shape (fields, n) and (fields, n, pools)."""
+        self.flush()
+        with open(self.path, "rb") as f:
+            pool_ids = self._read_header(f)
+            if pool_ids is None:
+                return
+            while True:
+                count = f.read(8)
+                if len(count) < 8:
+                    return
+                (n,) = struct.unpack("<q", count)
+                scalars = np.frombuffer(f.read(8 * len(ROUND_FIELDS) * n), dtype="<f8")
+                pools = np.frombuffer(f.read(8 * len(POOL_FIELDS) * n * len(pool_ids)), dtype="<f8")
+                yield scalars.reshape(len(ROUND_FIELDS), n), pools.reshape(len(POOL_FIELDS), n, len(pool_ids)), pool_ids
+
+    def __iter__(self):
+        return self._read()
+
+    def _read(self):
+        for scalars, pools, pool_ids in self.chunks():
+            for j in range(scalars.shape[1]):
+                snap = {field: _typed(field, scalars[i, j]) for i, field in enumerate(ROUND_FIELDS)}
+                snap["pool_stats"] = {
+                    pool_id: {field: _typed(field, pools[i, j, p]) for i, field in enumerate(POOL_FIELDS)}
+                    for p, pool_id in enumerate(pool_ids)
+                }
+                yield snap
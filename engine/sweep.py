@@ -0,0 +1,96 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from engine.analysis import summarize_world, attack_metrics
+from engine.simulation import run_simulation, run_paired_simulation
+
+
+def _run_job(params, keep_history):
+    history, world = run_simulation(**params)
+    return summarize_world(world), (history if keep_history else None)
+
+
+def _run_paired_job(params, keep_history):
+    baseline_history, baseline_world, attack_history, attack_world = run_paired_simulation(**params)
+    return ((summarize_world(baseline_world), baseline_history if keep_history else None),
+            (summarize_world(attack_world), attack_history if keep_history else None))
+
+
+def grid_points(grid):
+    """Cartesian product of a {param: [values]} grid, as a list of {param: value} dicts (grid order)."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_sweep(grid, max_workers=None, keep_history=False, derived=None, paired=False, **params):
+    """
+    Run baseline + attack for every point of `grid` across a process pool.
+
+    grid:         {run_simulation parameter: [values]}, e.g. {"victim_stake": v_pow, "attacker_stake": b_pow}
+    params:       run_simulation keyword arguments shared by every point. The attack job uses
+                  params' vote_omission_attack_on / vote_delay_attack_on; the baseline job turns both off.
+    derived:      optional callable point -> {parameter: value} for parameters that depend on the point
+                  (evaluated in this process, so it may be a lambda)
+    max_workers:  process count; 1 runs every job in this process
+    keep_history: also return the Metrics.history of both runs
+                  (pass cache=RunCache(...) in params to reuse baselines across sweeps; not with paired)
+    paired:       run baseline and attack of a point as one lockstep job with common random
+                  numbers (run_paired_simulation) instead of two independent jobs;
+                  raises ValueError if params carry a cache. A stopping_rule needs paired
+                  (independent runs stop at different rounds, which attack_metrics rejects);
+                  without it ValueError is raised before any job runs.
+
+    Every job seeds its own random.Random from params["seed"], so the results are identical to a
+    serial run whatever the number of workers.
+    Returns one row per point (grid order): the point's parameters, the attack_metrics() values
+    (effectiveness, cost, cost2, ...) and the baseline / attack WorldSummary (+ history).
+    """
+    if paired and params.get("cache") is not None:
+        raise ValueError("paired sweeps do not use a RunCache (run_paired_simulation has none)")
+    points = grid_points(grid)
+    jobs = []
+    for point in points:
+        attack_params = dict(params, **point)
+        if derived is not None:
+            attack_params.update(derived(point))
+        if paired:
+            jobs.append(attack_params)
+        else:
+            baseline_params = dict(attack_params, vote_omission_attack_on=False, vote_delay_attack_on=False)
+            jobs.append(baseline_params)
+            jobs.append(attack_params)
+    if not paired and any(job.get("stopping_rule") is not None for job in jobs):
+        raise ValueError("a stopping_rule needs paired=True: independent baseline and attack runs stop at different rounds")
+
+    job = _run_paired_job if paired else _run_job
+    if max_workers == 1:
+        results = [job(params, keep_history) for params in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(job, jobs, itertools.repeat(keep_history)))
+    if paired:
+        results = [run for pair in results for run in pair]
+
+    rows = []
+    for index, point in enumerate(points):
+        (baseline, baseline_history), (attack, attack_history) = results[2 * index], results[2 * index + 1]
+        row = dict(point)
+        row.update(attack_metrics(baseline, attack))
+        row.update({
+            "baseline": baseline,
+            "attack": attack,
+            "baseline_history": baseline_history,
+            "attack_history": attack_history,
+        })
+        rows.append(row)
+    return rows
+
+
+def format_table(rows, params, columns=("effectiveness", "cost", "cost2")):
+    """Plain-text result table: one line per sweep point with its grid `params` and `columns`."""
+    header = list(params) + list(columns)
+    lines = [" | ".join(f"{h:>14}" for h in header)]
+    for row in rows:
+        cells = [row[name] for name in header]
+        lines.append(" | ".join(f"{c:>14.6g}" if isinstance(c, float) else f"{str(c):>14}" for c in cells))
+    return "\n".join(lines)
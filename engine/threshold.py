@@ -0,0 +1,80 @@
+from engine.replicates import replicate_seeds, summarize_replicates
+from engine.simulation import SEED
+from engine.sweep import run_sweep
+
+
+def find_threshold(low, high, parameter="attacker_stake", metric="cost2", precision=0.01,
+                   replicates=4, max_replicates=32, seed=SEED, max_workers=None, paired=False,
+                   confidence=0.95, **params):
+    """
+    Bisect `parameter` on [low, high] for the value where `metric` changes sign,
+    e.g. the attacker stake from which attacker + ally become profitable (cost2 < 0).
+
+    params are run_simulation keyword arguments (victim_stake, pool_weights, sim_setup, ...)
+    shared by every run (a cache=RunCache(...) only without paired, as in run_sweep). Every evaluated value starts with `replicates` seeds; while the
+    confidence interval of the metric's mean still contains 0, `replicates` more seeds are
+    added, up to max_replicates (the sign of the mean is used after that). All values use the
+    same seeds (seed, seed + 1, ...), so neighbouring values are compared on the same sample paths.
+    Bisection stops once the bracket is narrower than `precision`.
+
+    Returns a dict with
+      threshold          - zero of the metric interpolated linearly between the bracket's means
+      ci_low, ci_high    - the nearest values on either side whose metric interval excludes 0
+                           (the search bounds when there are none)
+      evaluations        - one entry per evaluated value: parameter value, sign, whether the
+                           sign is significant, and the summarize_replicates() stats
+      runs               - every replicate row spent (run_sweep rows with the parameter value)
+    Raises ValueError when the metric has the same sign at low and high.
+    """
+    runs = []
+    evaluations = []
+
+    def evaluate(value):
+        rows = []
+        while True:
+            seeds = replicate_seeds(seed + len(rows), min(replicates, max_replicates - len(rows)))
+            new_rows = run_sweep({"seed": seeds}, max_workers=max_workers, paired=paired,
+                                 **dict(params, **{parameter: value}))
+            for row in new_rows:
+                row[parameter] = value
+            rows.extend(new_rows)
+            stats = summarize_replicates(rows, (metric,), confidence)[metric]
+            significant = stats["ci_low"] > 0 or stats["ci_high"] < 0
+            if significant or len(rows) >= max_replicates:
+                break
+        if stats["n"] == 0:
+            raise ValueError(f"{metric} is undefined in every replicate at {parameter}={value}")
+        runs.extend(rows)
+        evaluation = {parameter: value, "sign": 1 if stats["mean"] > 0 else -1,
+                      "significant": significant, "stats": stats}
+        evaluations.append(evaluation)
+        return evaluation
+
+    low_eval, high_eval = evaluate(low), evaluate(high)
+    if low_eval["sign"] == high_eval["sign"]:
+        raise ValueError(f"{metric} has the same sign at {parameter}={low} and {parameter}={high}")
+
+    while high - low > precision:
+        middle = (low + high) / 2
+        middle_eval = evaluate(middle)
+        if middle_eval["sign"] == low_eval["sign"]:
+            low, low_eval = middle, middle_eval
+        else:
+            high, high_eval = middle, middle_eval
+
+    low_mean, high_mean = low_eval["stats"]["mean"], high_eval["stats"]["mean"]
+    threshold = low + (high - low) * low_mean / (low_mean - high_mean)
+
+    below = [e[parameter] for e in evaluations
+             if e["significant"] and e["sign"] == low_eval["sign"] and e[parameter] <= low]
+    above = [e[parameter] for e in evaluations
+             if e["significant"] and e["sign"] == high_eval["sign"] and e[parameter] >= high]
+    return {
+        "parameter": parameter,
+        "metric": metric,
+        "threshold": threshold,
+        "ci_low": max(below) if below else min(e[parameter] for e in evaluations),
+        "ci_high": min(above) if above else max(e[parameter] for e in evaluations),
+        "evaluations": evaluations,
+        "runs": runs,
+    }
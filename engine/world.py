@@ -1,3 +1,6 @@
+from agents.byzantine import Byzantine
+from engine.sampler import WeightedSampler
+
 class World:
     def __init__(self, validators, delegators, setup, reward):
         self.validators = validators
@@ -7,51 +10,86 @@ class World:
 
         self.blockchain = []
         self.round_index = 0
-        self.pending_migrations = []          # list of dicts — ordered queue
+        self.stop_reason = None # set when a stopping rule (engine/convergence.py) ended the run early
+        # calendar queue: execute round -> [(delegator, from, to)] in scheduling order
+        self.pending_migrations = {}
+        self._pending_count = 0
+        self._next_migration_round = 0        # first round process_migrations has not handled yet
         self._pending_delegator_set = set()   # O(1) membership test: "does this delegator already have a pending migration?"
+                                              # (holds the delegators themselves, so it survives copying a World)
+        # validators by voting power, kept up to date by add_delegator / remove_delegator
+        self.voting_power_sampler = WeightedSampler(validators, [v.voting_power for v in validators])
+        for v in validators:
+            v.sampler = self.voting_power_sampler
+
+    def total_voting_power(self):
+        """
+        Sum of all validators' voting power: the root of voting_power_sampler, kept up to date
+        by add_delegator / remove_delegator, so it is not re-summed every round.
+        """
+        return self.voting_power_sampler.total()
 
     def pools(self):
         """Validators that are eligible to receive delegations."""
         return [v for v in self.validators if v.is_pool]
 
+    def attackers(self):
+        """Byzantine validators."""
+        return [v for v in self.validators if isinstance(v, Byzantine)]
+
+    def configure_attack(self, vote_omission_attack_on, vote_delay_attack_on, victim_ids=None):
+        """Switch the attackers' strategy (e.g. at a fork); victim_ids optionally retargets them."""
+        for attacker in self.attackers():
+            attacker.vote_omission_attack_on = vote_omission_attack_on
+            attacker.vote_delay_attack_on = vote_delay_attack_on
+            if victim_ids is not None:
+                attacker.victims = [v for v in self.validators if v.id in victim_ids]
+
+    def pending_migration_count(self):
+        return self._pending_count
+
     def schedule_migration(self, delegator, from_validator, to_validator, execute_round):
-        self.pending_migrations.append({
-            "delegator": delegator,
-            "from": from_validator,
-            "to": to_validator,
-            "execute_round": execute_round
-        })
-        self._pending_delegator_set.add(id(delegator))
+        # a round already processed is executed with the next one, like any overdue migration
+        execute_round = max(execute_round, self._next_migration_round)
+        self.pending_migrations.setdefault(execute_round, []).append((delegator, from_validator, to_validator))
+        self._pending_count += 1
+        self._pending_delegator_set.add(delegator)
 
     def process_migrations(self, current_round):
         """
         Execute all migrations whose time has come.
         Model: delegator stays with old validator until execution time.
+
+        Only the due rounds of the calendar are looked at. Voting power changes delegator by
+        delegator as before, but the sampler is updated once per pool that gained or lost
+        delegators.
         """
         executed = [] # list of (old_validator, new_validator)
-        remaining = []
-        for m in self.pending_migrations:
-            if m["execute_round"] <= current_round:
-                d = m["delegator"]
-                old = m["from"]
-                new = m["to"]
-
+        if not self._pending_count: # nothing scheduled: skip the empty rounds at once (e.g. macro steps)
+            self._next_migration_round = max(self._next_migration_round, current_round + 1)
+            return executed
+        changed = {} # pools whose voting power changed, in order
+        pending = self._pending_delegator_set
+        while self._next_migration_round <= current_round:
+            due = self.pending_migrations.pop(self._next_migration_round, ())
+            self._next_migration_round += 1
+            self._pending_count -= len(due)
+            for d, old, new in due:
+                pending.discard(d)
                 if d.bounded_validator != old:
                     continue  # unexpected behavior
 
                 # apply transition centrally
                 if old is not None:
-                    old.remove_delegator(d)
+                    old.remove_delegator(d, sync=False)
+                    changed[old] = None
 
                 if new is not None:
                     d.bounded_validator = new
-                    new.add_delegator(d)
+                    new.add_delegator(d, sync=False)
+                    changed[new] = None
 
                 executed.append((old, new))
-            else:
-                remaining.append(m)
-
-        self.pending_migrations = remaining
-        # Rebuild the fast-lookup set from remaining entries only
-        self._pending_delegator_set = {id(m["delegator"]) for m in remaining}
+        for v in changed:
+            v.sync_voting_power()
         return executed
@@ -1,17 +1,17 @@
 import os.path
 
-from agents.byzantine import Byzantine
-from engine.protocol import Protocol
-from engine.initializer import initialize_world
 from engine.plots import store_pool_stats_plot, store_pool_netflow_bars_plots
+from engine.cache import RunCache
+from engine.series import PoolSeries
+from engine.simulation import SEED
+from engine.sweep import run_sweep, format_table
+from engine.replicates import replicate_seeds, summarize_replicates, format_summary
 from setups.base_setup import Setup
 from setups.committee_selector import AllValidatorsSelector, WeightedRandomCommitteeSelector
 from setups.proposer_selector import WeightedProposerSelector
 from setups.vote_policy import ProbabilisticYesVotes
 from setups.reward_policy import CosmosRewardPolicy, EthereumRewardPolicy
-import random
 import time
-SEED = 42
 
 
 # -------------------------
@@ -67,47 +67,9 @@ def get_eth_rocketpool_setup(online_p=0.99, vote_p=0.995):
     )
 
 
-def run_simulation(com_size, number_of_rounds, reward_per_round,
-                   migration_rounds_delay, rounds_per_year_count,
-                   vote_omission_attack_on, vote_delay_attack_on,
-                   apr_window_length, sim_setup,
-                   victim_stake, attacker_stake, pool_weights,
-                   loyalty, pool_selection_weighted,
-                   validators_stake_dirichlet_distributed, delegators_stake_lognormal_distributed,
-                   aggregators_number, pull_prob, star_gap_multiplier):
-    random.seed(SEED)  # seed. Important for proper simulations of baseline & attacks
-    world = initialize_world(
-        num_validators=100-len(pool_weights)-2, #100 - pools - victim - attacker
-        pools_voting_powers=pool_weights,
-        num_delegators=1000,
-        setup=sim_setup,
-        reward_per_round=reward_per_round,
-        validator_frac=0.8,
-        max_validator_stake=0.33,
-        aggressiveness=0.1,
-        loyalty=loyalty,
-        pool_selection_weighted=pool_selection_weighted,
-        validators_stake_dirichlet_distributed=validators_stake_dirichlet_distributed,
-        delegators_stake_lognormal_distributed=delegators_stake_lognormal_distributed,
-        aggregators_number=aggregators_number,
-        verbose=False,
-        apr_window=apr_window_length,
-        pool_commission_rate=sim_setup.pool_commission_rate,
-        byzantine_validator_stake=attacker_stake,
-        victim_pool_stake=victim_stake,
-        vote_omission_attack_on=vote_omission_attack_on,
-        vote_delay_attack_on=vote_delay_attack_on,
-        pull_prob=pull_prob,
-        star_gap_multiplier=star_gap_multiplier,
-    )
-    protocol = Protocol(com_size, world, number_of_rounds, migration_rounds_delay, rounds_per_year_count,
-                        update_delegation_warm_up_rounds=apr_window_length * 3, verbose=False)
-    protocol.run()
-    return protocol.metrics.history, world
-
-
 def visualize(history, world, simulation_name):
     pool_ids = [v.id for v in world.pools()]
+    history = PoolSeries.from_history(history) # one pass over the snapshots; every plot below slices its arrays
     folder = os.path.join("out", simulation_name)
     store_pool_stats_plot(history, pool_ids, key="apr",
                           title="Pool APR over time",
@@ -168,122 +130,62 @@ if __name__ == '__main__':
 
     v_pow = [0.005]
     b_pow = [0.3]
-    for v in v_pow:
-        for b in b_pow:
-            print("Victim power ", v)
-            print("Attacker power ", b)
-            start_time = time.time()
-            baseline_history, baseline_world = run_simulation(committee_size, rounds, reward, migration_delay_rounds,
-                                                              rounds_per_year, False, False,
-                                                              apr_window, setup,
-                                                              victim_stake=v,
-                                                              attacker_stake=b,
-                                                              pool_weights = [v,v,v,v],
-                                                              loyalty=loyalty,
-                                                              pool_selection_weighted=pool_selection_weighted,
-                                                              validators_stake_dirichlet_distributed=validators_stake_dirichlet_distributed,
-                                                              delegators_stake_lognormal_distributed=delegators_stake_lognormal_distributed,
-                                                              aggregators_number=aggregators_number, pull_prob=pull_prob,
-                                                              star_gap_multiplier=2)
-
-            attack_run_history, attack_world = run_simulation(committee_size, rounds, reward, migration_delay_rounds,
-                                                              rounds_per_year,
-                                                              True, False,
-                                                              apr_window, setup,
-                                                              victim_stake=v,
-                                                              attacker_stake=b,
-                                                              pool_weights=[v,v,v,v],
-                                                              loyalty=loyalty,
-                                                              pool_selection_weighted=pool_selection_weighted,
-                                                              validators_stake_dirichlet_distributed=validators_stake_dirichlet_distributed,
-                                                              delegators_stake_lognormal_distributed=delegators_stake_lognormal_distributed,
-                                                              aggregators_number=aggregators_number, pull_prob=pull_prob,
-                                                              star_gap_multiplier=2)
-            end_time = time.time()
-            elapsed = end_time - start_time
-            print(f"Elapsed Time: {elapsed:.2f} seconds")
-            # visualization
-            visualize(baseline_history, baseline_world, "baseline")
-            visualize(attack_run_history, attack_world, "attack")
-
-            # calculate effectiveness / cost (utility: overall_rewards)
-            attr = ["overall_rewards"]
-            for a in attr:
-                print("Metric:", a)
-                utility_baseline = {}
-                delegators_baseline = {}
-                attacker_utility_baseline = 0
-                utility_attack = {}
-                delegators_attack = {}
-                attacker_utility_attack = 0
-                P_attacker = 0
-                for validator in baseline_world.validators:
-                    if isinstance(validator, Byzantine):
-                        attacker_utility_baseline = getattr(validator, a)
-                        P_attacker = validator.voting_power
-                        print("Attacker leader count (baseline)", validator.leader_count)
-                        print("Attacker attack count (baseline)", validator.attack_count)
-                    elif validator.is_pool:
-                        utility_baseline[validator.id] = getattr(validator, a)
-                        delegators_baseline[validator.id] = validator.dcount
-
-                for validator in attack_world.validators:
-                    if isinstance(validator, Byzantine):
-                        attacker_utility_attack = getattr(validator, a)
-                        P_attacker = validator.voting_power
-                        print("Attacker leader count (attack)", validator.leader_count)
-                        print("Attacker attack count (attack)", validator.attack_count)
-                    elif validator.is_pool:
-                        utility_attack[validator.id] = getattr(validator, a)
-                        delegators_attack[validator.id] = validator.dcount
-
-                eff_values = {}
-                for v_id, utility_value in utility_baseline.items():
-                    eff_values[v_id] = (utility_value - utility_attack[v_id]) / (utility_value * P_attacker)
-                max_eff_v_id = max(eff_values, key=eff_values.get)  # id of validator for which effectiveness is max
-                print("Id of validator for which effectiveness is max: ", max_eff_v_id)
-                effectiveness = eff_values[max_eff_v_id]
-                print("Effectiveness: ", effectiveness)
-
-                losses = {}
-                for v_id, utility_value in utility_baseline.items():
-                    losses[v_id] = utility_value - utility_attack[v_id]
-                loss_victim_id = max(losses, key=losses.get)  # id of validator for which loss is max
-                print("Id of validator for which loss is max: ", loss_victim_id)
-                attacker_loss = attacker_utility_baseline - attacker_utility_attack
-                cost = attacker_loss / losses[loss_victim_id]
-                print("Cost: ", cost)
-
-                # -------------------------
-                # ALLIED POOL ANALYSIS
-                # -------------------------
-                # Identify the pool that benefited most from the attack (captured migrating
-                # delegators). Compute adjusted metrics for the hypothetical combined entity
-                # (Byzantine attacker + allied pool operator = same economic actor).
-                #
-                # cost2 < 0  → attack was NET PROFITABLE for the combined entity
-                # cost2 ∈ (0, cost) → still a net cost, but lower than cost alone
-                ally_gains = {}
-                for v_id, baseline_reward in utility_baseline.items():
-                    extra = utility_attack[v_id] - baseline_reward
-                    if extra > 0:
-                        ally_gains[v_id] = extra
-
-                if ally_gains:
-                    best_ally_id = max(ally_gains, key=ally_gains.get)
-                    ally_extra_reward = ally_gains[best_ally_id]
-                    # VP from attack world (grew as delegators migrated to ally)
-                    P_ally = next(v.voting_power for v in attack_world.validators
-                                  if v.id == best_ally_id)
-
-                    victim_loss = losses[loss_victim_id]
-
-                    # Net cost to combined entity: negative means the attack was profitable
-                    cost2 = (attacker_loss - ally_extra_reward) / victim_loss
-
-                    print(f"Best ally pool id:          {best_ally_id}")
-                    print(f"Ally extra reward:          {ally_extra_reward:.6e}")
-                    print(f"Cost2 (net, attacker+ally): {cost2:.4f}")
-
-                print("Number of Delegators (pools). Baseline:", ", ".join([f"{v_id}:{num}" for v_id, num in delegators_baseline.items()]))
-                print("Number of Delegators (pools). Attack:", ", ".join([f"{v_id}:{num}" for v_id, num in delegators_attack.items()]))
+    workers = None  # None = one process per CPU core; 1 = run serially in this process
+    replicates = 1  # > 1: also run every point with seeds SEED, SEED+1, ... and report mean / SE / 95% CI
+    params = dict(com_size=committee_size, number_of_rounds=rounds, reward_per_round=reward,
+                  migration_rounds_delay=migration_delay_rounds, rounds_per_year_count=rounds_per_year,
+                  vote_omission_attack_on=True, vote_delay_attack_on=False,
+                  apr_window_length=apr_window, sim_setup=setup,
+                  loyalty=loyalty,
+                  pool_selection_weighted=pool_selection_weighted,
+                  validators_stake_dirichlet_distributed=validators_stake_dirichlet_distributed,
+                  delegators_stake_lognormal_distributed=delegators_stake_lognormal_distributed,
+                  aggregators_number=aggregators_number, pull_prob=pull_prob,
+                  star_gap_multiplier=2,
+                  cache=RunCache())  # baselines are reused from .cache/runs when nothing changed
+    start_time = time.time()
+    # every (v, b) point runs baseline + attack as two independent, seeded jobs
+    rows = run_sweep({"victim_stake": v_pow, "attacker_stake": b_pow},
+                     max_workers=workers, keep_history=True,
+                     derived=lambda point: {"pool_weights": [point["victim_stake"]] * 4},
+                     seed=SEED, **params)
+    end_time = time.time()
+    elapsed = end_time - start_time
+    print(f"Elapsed Time: {elapsed:.2f} seconds")
+
+    for row in rows:
+        print("Victim power ", row["victim_stake"])
+        print("Attacker power ", row["attacker_stake"])
+        # visualization
+        visualize(row["baseline_history"], row["baseline"], "baseline")
+        visualize(row["attack_history"], row["attack"], "attack")
+
+        # effectiveness / cost (utility: overall_rewards)
+        print("Metric:", "overall_rewards")
+        print("Attacker leader count (baseline)", row["attacker_leader_count_baseline"])
+        print("Attacker attack count (baseline)", row["attacker_attack_count_baseline"])
+        print("Attacker leader count (attack)", row["attacker_leader_count_attack"])
+        print("Attacker attack count (attack)", row["attacker_attack_count_attack"])
+        print("Id of validator for which effectiveness is max: ", row["max_eff_id"])
+        print("Effectiveness: ", row["effectiveness"])
+        print("Id of validator for which loss is max: ", row["loss_victim_id"])
+        print("Cost: ", row["cost"])
+
+        # cost2 < 0  → attack was NET PROFITABLE for the combined entity (attacker + best ally pool)
+        if row["cost2"] is not None:
+            print(f"Best ally pool id:          {row['best_ally_id']}")
+            print(f"Ally extra reward:          {row['ally_extra_reward']:.6e}")
+            print(f"Cost2 (net, attacker+ally): {row['cost2']:.4f}")
+
+        print("Number of Delegators (pools). Baseline:", ", ".join([f"{v_id}:{num}" for v_id, num in row["delegators_baseline"].items()]))
+        print("Number of Delegators (pools). Attack:", ", ".join([f"{v_id}:{num}" for v_id, num in row["delegators_attack"].items()]))
+
+    print(format_table(rows, ["victim_stake", "attacker_stake"]))
+
+    if replicates > 1:
+        for row in rows:
+            replicate_rows = run_sweep({"seed": replicate_seeds(SEED, replicates)}, max_workers=workers,
+                                       victim_stake=row["victim_stake"], attacker_stake=row["attacker_stake"],
+                                       pool_weights=[row["victim_stake"]] * 4, **params)
+            print(f"Victim power {row['victim_stake']}, attacker power {row['attacker_stake']}: {replicates} replicates")
+            print(format_summary(summarize_replicates(replicate_rows)))
@@ -8,9 +8,12 @@ class Block:
     def is_valid(self):
         return True
 
-    def is_confirmed(self, validators, selected_voters):
-        total_voting_power = sum(v.voting_power for v in validators)
-        selected_voting_power = sum(sv.voting_power for sv in selected_voters)
+    def is_confirmed(self, validators, selected_voters, total_voting_power=None, selected_voting_power=None):
+        # the sums may be passed in when the caller already has them (Committee.round)
+        if total_voting_power is None:
+            total_voting_power = sum(v.voting_power for v in validators)
+        if selected_voting_power is None:
+            selected_voting_power = sum(sv.voting_power for sv in selected_voters)
         if (selected_voting_power/total_voting_power) > (2 / 3):
             return True
         return False
\ No newline at end of file
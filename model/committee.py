@@ -1,3 +1,7 @@
+from itertools import compress
+
+from model.block import Block
+
 class Committee:
     def __init__(self, size, setup):
         self.size = size
@@ -5,7 +9,36 @@ class Committee:
         self.votes = {}
         self.proposer = None
         self.selected_voters = []
+        self.included_power = None # voting power of selected_voters, computed once per round by round()
         self.setup = setup
+        # lookups over self.validators when it is every validator in world order (Setup.select_committee):
+        self.sampler = None # WeightedSampler by voting power
+        self.index = None # validator -> position
+        self.members = None # validators as a NumPy object array
+        self.byzantine = None # validators whose vote_for_leader may say no (None: any member may)
+        self.block = None # Block reused every round (engine/round.py RoundContext); None: a new one per round
+
+    def new_block(self, proposer):
+        """Block proposed by `proposer` in this round."""
+        if self.block is None:
+            return Block(None, proposer, self)
+        self.block.proposer = proposer
+        return self.block
+
+    def total_power(self):
+        """voting power of the whole committee"""
+        if self.sampler is not None:
+            return self.sampler.total() # every validator: the world's running total
+        return sum(v.voting_power for v in self.validators)
+
+    def position(self, validator):
+        """index of `validator` in self.validators, None if it is not a member"""
+        if self.index is not None:
+            return self.index.get(validator)
+        try:
+            return self.validators.index(validator)
+        except ValueError:
+            return None
 
     # def total_voters_voting_power(self):
     #     total = sum(v.voting_power for v in self.selectedVoters)
@@ -33,11 +66,24 @@ class Committee:
     def round(self):
         self.setup.choose_proposer(self)
         new_block = self.proposer.propose(self)
-        for v in self.setup.get_voters(self, new_block):
-             self.votes[v] = v.sign(new_block)
+        mask = self.setup.get_voter_mask(self, new_block)
+        if mask is None:
+            for v in self.setup.get_voters(self, new_block):
+                 self.votes[v] = v.sign(new_block)
+            self.selected_voters = self.proposer.select_voters(self.votes)
+        else:
+            # vector path: every YES voter signs a valid block (Validator.sign); votes stays empty
+            if not new_block.is_valid():
+                mask[:] = False
+            mask = self.proposer.select_voter_mask(self, mask)
+            if self.members is not None:
+                self.selected_voters = self.members[mask].tolist()
+            else:
+                self.selected_voters = list(compress(self.validators, mask.tolist()))
 
-        self.selected_voters = self.proposer.select_voters(self.votes)
-        if new_block.is_confirmed(self.validators, self.selected_voters):
+        # shared by confirmation, rewards (RewardPolicy.distribute) and chain records
+        self.included_power = sum(v.voting_power for v in self.selected_voters)
+        if new_block.is_confirmed(self.validators, self.selected_voters, self.total_power(), self.included_power):
             return new_block
         else:
             print ("Invalid")
@@ -1,3 +1,5 @@
+import copy
+
 class Setup:
     def __init__(self, committee_selector, proposer_selector, vote_policy, reward_policy, pool_commission_rate=0.0):
         self.committee_selector = committee_selector
@@ -6,16 +8,38 @@ class Setup:
         self.reward_policy = reward_policy
         self.pool_commission_rate = pool_commission_rate
 
-    def select_committee(self, committee, validators):
-        committee.validators = self.committee_selector.select(validators, committee.size)
+    def bind_rng(self, rng, **policy_rngs):
+        """
+        Return a copy of this setup whose policies draw from `rng` instead of the global
+        `random` module, so that simulations sharing one Setup never share a random stream.
+        policy_rngs optionally gives a policy its own stream, e.g. proposer_selector=Random(1).
+        """
+        bound = copy.copy(self)
+        for name in ("committee_selector", "proposer_selector", "vote_policy"):
+            policy = copy.copy(getattr(self, name))
+            policy.rng = policy_rngs.get(name, rng)
+            setattr(bound, name, policy)
+        return bound
+
+    def select_committee(self, committee, validators, context=None):
+        self.committee_selector.select_into(committee.validators, validators, committee.size)
+        # a committee of all validators uses the round context's lookups over them (engine/round.py):
+        # voting power sampler for the proposer, positions, validator array for the vote masks
+        if context is not None and self.committee_selector.selects_all:
+            committee.sampler, committee.index, committee.members = context.sampler, context.index, context.members
+        else:
+            committee.sampler = committee.index = committee.members = None
         for v in committee.validators:
             v.count += 1
 
     def choose_proposer(self, committee):
-        committee.proposer = self.proposer_selector.choose(committee.validators)
+        committee.proposer = self.proposer_selector.choose_with_sampler(committee.validators, committee.sampler)
 
     def get_voters(self, committee, block):
         return self.vote_policy.decide_voters(committee, block)
 
+    def get_voter_mask(self, committee, block):
+        return self.vote_policy.decide_voter_mask(committee, block)
+
     def distribute_rewards(self, committee, reward_amount):
         self.reward_policy.distribute(committee, reward_amount)
\ No newline at end of file
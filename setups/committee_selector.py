@@ -1,21 +1,43 @@
 from abc import ABC, abstractmethod
 import random
+import numpy as np
 
 class CommitteeSelector(ABC):
+    rng = random # random source; Setup.bind_rng gives each simulation its own instance
+    selects_all = False # True: the committee is always every validator, in world order
+
     @abstractmethod
     def select(self, validators, size):
         """return list of validators"""
         pass
 
+    def select_into(self, out, validators, size):
+        """Fill the list `out` in place with the selected validators (reused committee buffers)."""
+        out[:] = self.select(validators, size)
+
 class AllValidatorsSelector(CommitteeSelector):
+    selects_all = True
+
     def select(self, validators, size):
         return list(validators)
 
+    def select_into(self, out, validators, size):
+        out[:] = validators
+
 class WeightedRandomCommitteeSelector(CommitteeSelector):
     def select(self, validators, size):
-        size = min(size, len(validators))
-        chosen = set()
-        weights = [v.voting_power for v in validators]
-        while len(chosen) < size:
-            chosen.add(random.choices(validators, weights=weights, k=1)[0])
-        return list(chosen)
\ No newline at end of file
+        """
+        `size` validators drawn without replacement, each next one with probability proportional
+        to voting power among those not drawn yet (Efraimidis-Spirakis: the `size` largest keys
+        u ** (1 / w), compared as log(u) / w). O(V) vector operations instead of redrawing
+        until `size` distinct validators came up. Returned in world order.
+        """
+        if size >= len(validators):
+            return list(validators)
+        weights = np.fromiter((v.voting_power for v in validators), dtype=float, count=len(validators))
+        # one draw from the policy's rng seeds the vector of uniforms
+        u = np.random.default_rng(self.rng.getrandbits(64)).random(len(validators))
+        with np.errstate(divide="ignore"):
+            keys = np.log1p(-u) / weights # log(1 - u) with 1 - u in (0, 1]; -inf for zero weights
+        chosen = np.argpartition(keys, len(validators) - size)[len(validators) - size:]
+        return [validators[i] for i in np.sort(chosen).tolist()]
\ No newline at end of file
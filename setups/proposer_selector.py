@@ -2,11 +2,25 @@ from abc import ABC, abstractmethod
 import random
 
 class ProposerSelector(ABC):
+    rng = random # random source; Setup.bind_rng gives each simulation its own instance
+
     @abstractmethod
     def choose(self, committee_validators):
         pass
 
+    def choose_with_sampler(self, committee_validators, sampler):
+        """
+        choose() for a committee of all validators; `sampler` is the world's WeightedSampler
+        over voting power (None when the committee is a subset).
+        """
+        return self.choose(committee_validators)
+
 class WeightedProposerSelector(ProposerSelector):
     def choose(self, committee_validators):
         weights = [v.voting_power for v in committee_validators]
-        return random.choices(committee_validators, weights=weights, k=1)[0]
\ No newline at end of file
+        return self.rng.choices(committee_validators, weights=weights, k=1)[0]
+
+    def choose_with_sampler(self, committee_validators, sampler):
+        if sampler is None:
+            return self.choose(committee_validators)
+        return sampler.sample(self.rng) # same distribution in O(log V)
\ No newline at end of file
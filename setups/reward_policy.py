@@ -1,64 +1,101 @@
 from abc import ABC, abstractmethod
+import numpy as np
 
 class RewardPolicy(ABC):
+    """
+    Every round's reward is linear in the validators' voting power, so a policy only has to
+    provide three per-round coefficients (see coefficients()):
+        reward[v] = voting_power[v] * (per_power + per_power_included * [v included])
+                    + proposer_bonus * [v is proposer]
+    distribute() applies them with one update_reward call per committee member;
+    distribute_many() applies them to a whole batch of rounds at once.
+    """
+
     @abstractmethod
-    def distribute(self, committee, reward_amount):
+    def coefficients(self, included_power, reward_amount):
+        """return (per_power, per_power_included, proposer_bonus); included_power may be an array of rounds"""
         pass
 
+    def distribute(self, committee, reward_amount):
+        included_power = committee.included_power
+        if included_power is None:
+            included_power = sum(v.voting_power for v in committee.selected_voters)
+        receivers = set(committee.selected_voters)
+        per_power, per_power_included, proposer_bonus = self.coefficients(included_power, reward_amount)
+
+        for v in committee.validators:
+            coefficient = per_power + per_power_included if v in receivers else per_power
+            reward = coefficient * v.voting_power
+            if v is committee.proposer:
+                reward += proposer_bonus
+            v.update_reward(reward)
+
+    def distribute_many(self, voting_power, included, proposers, reward_amount, included_power=None):
+        """
+        Batched distribute() over K rounds whose committee is every validator.
+
+        voting_power: (V,) or (K, V) voting power per validator
+        included:     (K, V) boolean mask of included voters (committee.selected_voters)
+        proposers:    (K,) index of each round's proposer
+        included_power: optional (K,) included voting power per round, if already known
+        Returns a (K, V) array with the reward credited to every validator in every round.
+        """
+        included = np.asarray(included, dtype=bool)
+        k = included.shape[0]
+        voting_power = np.broadcast_to(np.asarray(voting_power, dtype=float), included.shape)
+        if included_power is None:
+            included_power = (voting_power * included).sum(axis=1)
+
+        per_power, per_power_included, proposer_bonus = (
+            np.broadcast_to(np.asarray(c, dtype=float), (k,))
+            for c in self.coefficients(included_power, reward_amount))
+
+        rewards = voting_power * (per_power[:, np.newaxis] + per_power_included[:, np.newaxis] * included)
+        rewards[np.arange(k), proposers] += proposer_bonus
+        return rewards
+
 class CosmosRewardPolicy(RewardPolicy):
     def __init__(self, base_reward_fraction = 0.9, proposer_bonus_fraction = 0.05, bonus_threshold = 2/3):
         self.base_reward_fraction = base_reward_fraction # a parameter from paper
         self.proposer_bonus_fraction = proposer_bonus_fraction # b parameter from paper
         self.bonus_threshold = bonus_threshold # t parameter from paper
 
-    def distribute(self, committee, reward_amount):
-        receivers = committee.selected_voters
-        included_power = sum(v.voting_power for v in receivers)
+    def coefficients(self, included_power, reward_amount):
+        a = self.base_reward_fraction
+        b = self.proposer_bonus_fraction
+        bonus_scale = (included_power - self.bonus_threshold) / (1 - self.bonus_threshold)
 
         # Step 1: leader’s bonus
-        leader_bonus = reward_amount * self.proposer_bonus_fraction * (1 - self.base_reward_fraction ) * ((included_power -  self.bonus_threshold) / (1 - self.bonus_threshold))
-        committee.proposer.update_reward(leader_bonus)
+        leader_bonus = reward_amount * b * (1 - a) * bonus_scale
 
-        # Step 2: voting reward
-        voting_reward = (1 - self.base_reward_fraction) * (1 - self.proposer_bonus_fraction ) * reward_amount
-        for v in receivers:
-            v.update_reward(voting_reward * v.voting_power)
+        # Step 2: voting reward (included voters only)
+        voting_reward = (1 - a) * (1 - b) * reward_amount
 
         # Step 3: base reward
-        base_reward = self.base_reward_fraction * reward_amount
-        for v in committee.validators:
-            v.update_reward(base_reward * v.voting_power)
+        base_reward = a * reward_amount
 
         # Step 4: redistributed bonus (in case some signatures are omitted)
-        redistributed_bonus = (1 - ((included_power -  self.bonus_threshold) / (1 - self.bonus_threshold))) * self.proposer_bonus_fraction * (1 - self.base_reward_fraction) * reward_amount
-        for v in committee.validators:
-            v.update_reward(redistributed_bonus * v.voting_power)
+        redistributed_bonus = (1 - bonus_scale) * b * (1 - a) * reward_amount
 
-        # Step 4: voting reward (in case some signatures are omitted)
-        voting_reward2 = (1 - included_power) * (1 - self.base_reward_fraction) * (1 - self.proposer_bonus_fraction) * reward_amount
-        for v in committee.validators:
-            v.update_reward(voting_reward2 * v.voting_power)
+        # Step 5: voting reward (in case some signatures are omitted)
+        voting_reward2 = (1 - included_power) * (1 - a) * (1 - b) * reward_amount
+
+        return base_reward + redistributed_bonus + voting_reward2, voting_reward, leader_bonus
 
 class EthereumRewardPolicy(RewardPolicy):
     def __init__(self, proposer_cut=1/8, p = 0.781):
         self.proposer_cut = proposer_cut # fraction of the leader’s bonus (parameter b from the paper)
         self.p = p # fraction of a voters reward, received on late inclusion (parameter p from the paper)
 
-    def distribute(self, committee, reward_amount):
+    def coefficients(self, included_power, reward_amount):
         # Step 1: Reward received either on timely or late inclusion.
         # Since we assume all votes are included within the window, this term is not scaled.
         base_total = reward_amount * self.p # p * R
-        for v in committee.validators:
-            v.update_reward(base_total * v.voting_power)
 
         # Step 2: The reward received only for timely inclusion and it is scaled by the included power
-        receivers = committee.selected_voters
-        included_power = sum(v.voting_power for v in receivers)
         timely_inclusion_reward = (1.0 - self.p) * reward_amount * included_power # (1-p) * R * ΣP
 
-        for v in receivers:
-            v.update_reward(timely_inclusion_reward * v.voting_power)
-
         # Step 3: The leaders bonus
-        leader_bonus = self.proposer_cut *  included_power * reward_amount
-        committee.proposer.update_reward(leader_bonus)
\ No newline at end of file
+        leader_bonus = self.proposer_cut * included_power * reward_amount
+
+        return base_total, timely_inclusion_reward, leader_bonus
@@ -1,27 +1,80 @@
 from abc import ABC, abstractmethod
 import random
+import numpy as np
 
 class VotePolicy(ABC):
+    rng = random # random source; Setup.bind_rng gives each simulation its own instance
+
     @abstractmethod
     def decide_voters(self, committee, block):
         """return list of validators that are YES and included in 'vote power'"""
         pass
 
+    def decide_voter_mask(self, committee, block):
+        """
+        Vector form of decide_voters: boolean array over committee.validators, True for YES.
+        None when the policy has no vector form (Committee.round then calls decide_voters).
+        """
+        return None
+
 class ProbabilisticYesVotes(VotePolicy):
+    UNIFORM_BLOCK = 1 << 14 # uniforms drawn at a time for decide_voter_mask (at least 16 rounds' worth)
+
     def __init__(self, online_p=0.98, vote_p=0.995):
         self.online_p = online_p
         self.vote_p = vote_p
+        self._uniforms = np.zeros(0)
+        self._next_uniform = 0
+
+    def __copy__(self):
+        # a copy gets its own rng (Setup.bind_rng): uniforms drawn from the original's are not carried over
+        policy = type(self).__new__(type(self))
+        policy.__dict__.update(self.__dict__)
+        policy._uniforms = np.zeros(0)
+        policy._next_uniform = 0
+        return policy
+
+    def draw_uniforms(self, n):
+        """
+        n uniforms in [0, 1). They are drawn UNIFORM_BLOCK at a time from a NumPy generator
+        seeded with one number from self.rng, so the cost per round hardly depends on n.
+        """
+        if self._next_uniform + n > len(self._uniforms):
+            generator = np.random.default_rng(self.rng.getrandbits(64))
+            self._uniforms = generator.random(max(self.UNIFORM_BLOCK, 16 * n))
+            self._next_uniform = 0
+        u = self._uniforms[self._next_uniform:self._next_uniform + n]
+        self._next_uniform += n
+        return u
 
     def decide_voters(self, committee, block):
         yes = [committee.proposer] # leader is always included
         for v in committee.validators:
             if committee.proposer == v:
                 continue
-            r = random.random()
+            r = self.rng.random()
             if not v.vote_for_leader(committee.proposer):
                 continue
             if r > self.online_p:
                 continue  # offline
             if r <= self.vote_p:
                 yes.append(v)  # vote for block
+        return yes
+
+    def decide_voter_mask(self, committee, block):
+        validators = committee.validators
+        proposer = committee.proposer
+        u = self.draw_uniforms(len(validators))
+        yes = (u <= self.online_p) & (u <= self.vote_p) # online and votes for the block
+        # only validators that may refuse the leader (committee.byzantine) are asked
+        if committee.byzantine is None:
+            candidates = enumerate(validators)
+        else:
+            candidates = ((committee.position(v), v) for v in committee.byzantine)
+        for i, v in candidates:
+            if i is None or v is proposer:
+                continue
+            if not v.vote_for_leader(proposer):
+                yes[i] = False
+        yes[committee.position(proposer)] = True # leader is always included
         return yes
\ No newline at end of file